@@ -0,0 +1,202 @@
+"""Асинхронные версии ленты, страницы категории и страницы публикации.
+
+ORM в Django 3.2 синхронный, поэтому каждый запрос к базе выполняется
+в пуле потоков, а независимые запросы страницы (число постов и сама
+страница, категория, комментарии) — одновременно. Пока они идут,
+обработчик не занимает поток ASGI-сервера.
+
+Подключаются вместо классов из `views.py` настройкой
+`BLOG_ASYNC_VIEWS`.
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import Page, Paginator
+from django.db import close_old_connections
+from django.http import Http404
+from django.shortcuts import get_object_or_404, render
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .cache import (
+    category_listing, comments_activity, feed_listing, get_cached_page,
+    listing_tags, page_etag, post_page_tags, set_cached_page,
+    set_card_versions, shared_records, version_name)
+from .forms import CommentForm
+from .models import Category, Comment, Post
+from .pagination import CursorPaginator, InvalidCursor
+from .routers import replica_reads
+from .views import COMMENTS_PER_PAGE, PAGIATE_OF_PAGES, posts_filter
+
+
+def in_thread(func, *args, **kwargs):
+    """Выполняет синхронный код в отдельном потоке пула, не дожидаясь
+    других таких вызовов этого запроса.
+    """
+    def call():
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(call, thread_sensitive=False)()
+
+
+def conditional_get(get_versions):
+    """Асинхронный аналог `views.ConditionalGetMixin`."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view(request, *args, **kwargs)
+            etag = await sync_to_async(page_etag)(
+                request, get_versions(**kwargs))
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def replica_read(view):
+    """Асинхронный аналог `views.ReplicaReadMixin`: потоки пула получают
+    копию контекста и тоже читают с реплики.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        with replica_reads(request):
+            return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def listing_versions(**kwargs):
+    return (feed_listing(), shared_records(), comments_activity())
+
+
+def anonymous_page_cache(get_tags):
+    """Асинхронный аналог `views.AnonymousPageCacheMixin`."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            anonymous = (
+                request.method in ('GET', 'HEAD')
+                and not await sync_to_async(
+                    lambda: request.user.is_authenticated)()
+            )
+            if anonymous:
+                response = await in_thread(get_cached_page, request)
+                if response is not None:
+                    return response
+            response, context = await view(request, *args, **kwargs)
+            if anonymous and response.status_code == 200 and (
+                    not response.cookies):
+                await in_thread(
+                    set_cached_page, request, response, get_tags(context),
+                    settings.BLOG_PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
+
+
+async def paginate(request, queryset):
+    """Страница постов: `COUNT(*)` и выборка идут одновременно."""
+    if settings.BLOG_CURSOR_PAGINATION:
+        paginator = CursorPaginator(
+            queryset, PAGIATE_OF_PAGES, ('-pub_date', '-id'))
+        try:
+            return await in_thread(paginator.page, request.GET.get('cursor'))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+    try:
+        number = int(request.GET.get('page') or 1)
+    except ValueError:
+        raise Http404('Некорректный номер страницы')
+    if number < 1:
+        raise Http404('Некорректный номер страницы')
+    offset = (number - 1) * PAGIATE_OF_PAGES
+    count, posts = await asyncio.gather(
+        in_thread(queryset.count),
+        in_thread(list, queryset[offset:offset + PAGIATE_OF_PAGES]),
+    )
+    paginator = Paginator(queryset, PAGIATE_OF_PAGES)
+    paginator.count = count
+    if number > paginator.num_pages:
+        raise Http404('Страница не найдена')
+    return Page(posts, number, paginator)
+
+
+async def render_page(request, template_name, context):
+    await in_thread(set_card_versions, context['page_obj'])
+    context['card_cache_timeout'] = settings.BLOG_CARD_CACHE_TIMEOUT
+    response = await sync_to_async(render)(request, template_name, context)
+    return response, context
+
+
+@replica_read
+@conditional_get(listing_versions)
+@anonymous_page_cache(
+    lambda context: listing_tags(context['page_obj'], feed_listing()))
+async def post_list(request):
+    page = await paginate(request, posts_filter())
+    return await render_page(request, 'blog/index.html', {'page_obj': page})
+
+
+@replica_read
+@conditional_get(listing_versions)
+@anonymous_page_cache(
+    lambda context: listing_tags(
+        context['page_obj'],
+        version_name('category', context['category'].pk),
+        category_listing(context['category'].pk),
+    ))
+async def category_posts(request, category_slug):
+    category, page = await asyncio.gather(
+        in_thread(
+            get_object_or_404, Category,
+            is_published=True, slug=category_slug),
+        paginate(request, posts_filter().filter(
+            category__slug=category_slug)),
+    )
+    return await render_page(request, 'blog/category.html', {
+        'category': category,
+        'page_obj': page,
+    })
+
+
+@replica_read
+@conditional_get(
+    lambda pk: (version_name('post', pk), shared_records()))
+@anonymous_page_cache(
+    lambda context: post_page_tags(context['post'], context['comments']))
+async def post_detail(request, pk):
+    comments = CursorPaginator(
+        Comment.objects.filter(post_id=pk).select_related('author'),
+        COMMENTS_PER_PAGE,
+        ('created_at', 'id'),
+    )
+    post, comments_page = await asyncio.gather(
+        in_thread(
+            get_object_or_404,
+            Post.objects.select_related('author', 'location', 'category'),
+            pk=pk),
+        in_thread(comments.page),
+    )
+    user_id = await sync_to_async(lambda: request.user.pk)()
+    if post.author_id != user_id and (
+        post.is_visible is False
+        or post.category.is_published is False
+    ):
+        raise Http404
+    context = {
+        'post': post,
+        'object': post,
+        'form': CommentForm(),
+        'comments': comments_page,
+    }
+    response = await sync_to_async(render)(
+        request, 'blog/detail.html', context)
+    return response, context
@@ -0,0 +1,151 @@
+"""Версии закэшированных фрагментов и страниц.
+
+Каждой записи, от которой зависит закэшированный HTML, соответствует
+версия в кэше. Версия входит в ключ фрагмента, поэтому при изменении
+записи достаточно сменить версию — старые фрагменты просто перестают
+запрашиваться и вытесняются сами.
+
+Страницы для анонимных читателей хранятся вместе со списком версий,
+действовавших при рендеринге (тегов), и отдаются из кэша, только пока
+все эти версии не изменились.
+"""
+import time
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+VERSION_KEY = 'blog:version:{}'
+PAGE_KEY = 'blog:page:{}'
+# Время последней смены версий, см. `blog.routers`.
+LAST_BUMP_KEY = 'blog:last-bump'
+
+
+def version_name(model_name, pk):
+    return f'{model_name}:{pk}'
+
+
+def feed_listing():
+    """Состав ленты: меняется при изменении любой публикации
+    или категории.
+    """
+    return version_name('listing', 'feed')
+
+
+def category_listing(category_id):
+    return version_name('listing:category', category_id)
+
+
+def shared_records():
+    """Любой автор, категория или местоположение: меняются редко, а
+    показаны почти на каждой странице.
+    """
+    return version_name('listing', 'shared')
+
+
+def comments_activity():
+    """Любой комментарий: от них зависят счётчики в карточках."""
+    return version_name('listing', 'comments')
+
+
+def get_versions(names):
+    """Возвращает словарь `{имя: версия}` одним обращением к кэшу.
+
+    Отсутствующие версии (новые или вытесненные записи) создаются.
+    """
+    keys = {VERSION_KEY.format(name): name for name in names}
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def bump_versions(names):
+    cache.set_many({
+        **{VERSION_KEY.format(name): uuid4().hex for name in names},
+        LAST_BUMP_KEY: time.time(),
+    }, timeout=None)
+
+
+def bumped_within(seconds):
+    """Менялась ли какая-нибудь версия за последние `seconds` секунд."""
+    last_bump = cache.get(LAST_BUMP_KEY)
+    return last_bump is not None and time.time() - last_bump < seconds
+
+
+def card_dependencies(post):
+    return (
+        version_name('post', post.pk),
+        version_name('user', post.author_id),
+        version_name('category', post.category_id),
+        version_name('location', post.location_id),
+    )
+
+
+def set_card_versions(posts):
+    """Проставляет `card_version` публикациям страницы.
+
+    Версия карточки меняется при изменении самой публикации, имени её
+    автора, категории, местоположения и числа комментариев; вход автора
+    в систему её не меняет.
+    """
+    posts = list(posts)
+    versions = get_versions(
+        {name for post in posts for name in card_dependencies(post)})
+    for post in posts:
+        post.card_version = '.'.join(
+            [versions[name] for name in card_dependencies(post)]
+            + [str(post.comment_count)]
+        )
+    return posts
+
+
+def listing_tags(posts, *tags):
+    """Теги страницы со списком карточек."""
+    return [*tags, *(
+        name for post in posts for name in card_dependencies(post))]
+
+
+def post_page_tags(post, comments):
+    return [*card_dependencies(post), *(
+        version_name('user', comment.author_id) for comment in comments)]
+
+
+def page_etag(request, names):
+    """Собирает ETag страницы без обращения к базе: из версий, от которых
+    она зависит, и всего, что отличается у разных посетителей.
+    """
+    versions = get_versions(names)
+    parts = [
+        request.get_full_path(),
+        str(request.user.pk),
+        request.META.get('CSRF_COOKIE', ''),
+        *(versions[name] for name in sorted(versions)),
+    ]
+    return '"%s"' % md5('|'.join(parts).encode()).hexdigest()
+
+
+def page_cache_key(request):
+    return PAGE_KEY.format(
+        md5(request.get_full_path().encode()).hexdigest())
+
+
+def get_cached_page(request):
+    entry = cache.get(page_cache_key(request))
+    if entry is None or get_versions(entry['tags']) != entry['versions']:
+        return None
+    return HttpResponse(entry['content'],
+                        content_type=entry['content_type'])
+
+
+def set_cached_page(request, response, tags, timeout):
+    tags = set(tags)
+    cache.set(page_cache_key(request), {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'tags': tags,
+        'versions': get_versions(tags),
+    }, timeout)
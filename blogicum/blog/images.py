@@ -0,0 +1,166 @@
+"""Обработка загруженных фотографий публикаций.
+
+После загрузки оригинал очищается от EXIF (с поворотом по метке
+ориентации), а по нему строятся уменьшенные копии заданных ширин в WebP
+и JPEG. Шаблоны выводят их через `srcset`, чтобы лента не скачивала
+оригиналы. Обработка идёт в фоновых потоках после фиксации транзакции,
+не задерживая ответ автору.
+"""
+import logging
+import queue
+import threading
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .cache import bump_versions, category_listing, feed_listing, version_name
+
+logger = logging.getLogger(__name__)
+
+# Формат Pillow, расширение файла и параметры сохранения.
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True,
+                             'progressive': True}),
+}
+# Оригиналы в этих форматах пересохраняются без EXIF.
+STRIPPED_FORMATS = {'JPEG': {'quality': 90}, 'PNG': {}, 'WEBP': {}}
+
+
+def variant_name(name, width, fmt):
+    path = PurePosixPath(name)
+    extension = FORMATS[fmt][1]
+    return str(path.parent / 'variants' / f'{path.stem}_{width}w.{extension}')
+
+
+def encode(image, fmt):
+    pil_format, _, options = FORMATS[fmt]
+    if pil_format == 'JPEG':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        transparent = ('A' in image.getbands()
+                       or 'transparency' in image.info)
+        image = image.convert('RGBA' if transparent else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def replace_file(storage, name, content):
+    """Записывает файл под заданным именем, а не под свободным."""
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, content)
+
+
+def strip_metadata(storage, name, image):
+    """Убирает EXIF из оригинала, повернув снимок по ориентации.
+    Возвращает изображение в правильной ориентации.
+    """
+    exif = image.getexif()
+    if not exif or image.format not in STRIPPED_FORMATS:
+        return ImageOps.exif_transpose(image)
+    pil_format = image.format
+    image = ImageOps.exif_transpose(image)
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **STRIPPED_FORMATS[pil_format])
+    replace_file(storage, name, ContentFile(buffer.getvalue()))
+    return image
+
+
+def process_post_image(post_id):
+    """Обрабатывает фото публикации и сохраняет его размеры и список
+    копий в `Post.image_info`.
+    """
+    from .models import Post
+
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    storage, name = post.image.storage, post.image.name
+    with storage.open(name) as file, Image.open(file) as original:
+        original.load()
+        image = strip_metadata(storage, name, original)
+    width, height = image.size
+
+    for variant in post.image_variants:
+        if storage.exists(variant['name']):
+            storage.delete(variant['name'])
+    widths = [w for w in settings.BLOG_IMAGE_WIDTHS if w < width] + [width]
+    variants = []
+    for variant_width in widths:
+        resized = image
+        if variant_width < width:
+            resized = image.resize(
+                (variant_width, round(height * variant_width / width)),
+                Image.LANCZOS)
+        for fmt in FORMATS:
+            variants.append({
+                'format': fmt,
+                'width': variant_width,
+                'name': replace_file(
+                    storage, variant_name(name, variant_width, fmt),
+                    encode(resized, fmt)),
+            })
+
+    # Пока шла обработка, автор мог изменить пост; `save()` записал бы
+    # поверх его правок старые `is_visible` и остальные поля.
+    Post.objects.filter(pk=post.pk).update(image_info={
+        'width': width, 'height': height, 'variants': variants})
+    bump_versions({
+        version_name('post', post.pk),
+        feed_listing(),
+        category_listing(post.category_id),
+    })
+
+
+class ImageWorker:
+    """Очередь обработки фото с пулом фоновых потоков внутри процесса."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def put(self, post_id):
+        if settings.BLOG_IMAGE_WORKERS == 0:
+            self.process(post_id)
+            return
+        self.start()
+        self.queue.put(post_id)
+
+    def start(self):
+        with self.lock:
+            while len(self.threads) < settings.BLOG_IMAGE_WORKERS:
+                thread = threading.Thread(
+                    target=self.run, name='blog-image-worker', daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def run(self):
+        while True:
+            post_id = self.queue.get()
+            try:
+                self.process(post_id)
+            finally:
+                close_old_connections()
+                self.queue.task_done()
+
+    def process(self, post_id):
+        try:
+            process_post_image(post_id)
+        except Exception:
+            logger.exception('Не удалось обработать фото публикации %s',
+                             post_id)
+
+
+worker = ImageWorker()
+
+
+def schedule_processing(post_id):
+    """Ставит фото в очередь, когда пост точно записан в базу."""
+    transaction.on_commit(lambda: worker.put(post_id))
@@ -0,0 +1,85 @@
+"""Ссылки на страницы блога без обхода маршрутов.
+
+`reverse()` при каждом вызове ищет маршрут среди всех вариантов,
+подставляет аргументы и проверяет результат регулярным выражением:
+страница из десяти карточек с комментариями делала так десятки раз.
+`link()` разворачивает маршрут один раз, подставив числовые образцы
+вместо аргументов, и запоминает строку формата и конвертеры аргументов
+из маршрута. Дальше ссылка — это проверка аргументов регулярными
+выражениями конвертеров и `str.format`; результат совпадает с
+`reverse()`, а неподходящие аргументы так же дают `NoReverseMatch`.
+
+Подходят маршруты с позиционными аргументами, конвертеры которых
+принимают числа: `int`, `slug`, `str` и `path`.
+"""
+import re
+from urllib.parse import quote
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import NoReverseMatch, get_script_prefix, resolve, reverse
+from django.urls.converters import get_converter
+from django.utils.http import RFC3986_SUBDELIMS
+
+# Разбор параметров маршрута, как в `django.urls.resolvers`.
+PARAMETER_RE = re.compile(r'<(?:(?P<converter>[^>:]+):)?(?P<name>[^>]+)>')
+# Символы, которые `reverse()` не кодирует.
+SAFE_CHARS = RFC3986_SUBDELIMS + '/~:@'
+SAMPLE = 904_127_300_000
+
+formats = {}
+
+
+class LinkFormat:
+    """Развёрнутый маршрут: строка формата и конвертеры аргументов."""
+
+    def __init__(self, view_name, arity):
+        self.view_name = view_name
+        samples = [str(SAMPLE + number) for number in range(arity)]
+        url = reverse(view_name, args=samples)
+        # Ссылка строится без префикса скрипта: он свой у каждого запроса.
+        path = url[len(get_script_prefix()):]
+        match = resolve('/' + path)
+        if match.view_name != view_name:
+            raise ImproperlyConfigured(
+                f'{view_name}: образец ссылки ведёт на {match.view_name}.')
+        self.converters = []
+        for parameter in PARAMETER_RE.finditer(match.route):
+            converter = get_converter(parameter['converter'] or 'str')
+            self.converters.append((converter, re.compile(converter.regex)))
+        template = path.replace('{', '{{').replace('}', '}}')
+        for sample in samples:
+            if template.count(sample) != 1:
+                raise ImproperlyConfigured(
+                    f'{view_name}: образец {sample} совпал с адресом.')
+            template = template.replace(sample, '{}')
+        self.template = template
+
+    def format(self, args):
+        parts = []
+        for (converter, regex), value in zip(self.converters, args):
+            try:
+                text = str(converter.to_url(value))
+            except ValueError:
+                text = None
+            if text is None or not regex.fullmatch(text):
+                raise NoReverseMatch(
+                    f'Аргумент {value!r} не подходит для {self.view_name}.')
+            parts.append(quote(text, safe=SAFE_CHARS))
+        return get_script_prefix() + self.template.format(*parts)
+
+
+def link(view_name, *args):
+    """То же, что `reverse(view_name, args=args)`, без обхода маршрутов."""
+    key = (view_name, len(args))
+    link_format = formats.get(key)
+    if link_format is None:
+        link_format = formats[key] = LinkFormat(view_name, len(args))
+    return link_format.format(args)
+
+
+@receiver(setting_changed)
+def urlconf_changed(sender, setting, **kwargs):
+    if setting == 'ROOT_URLCONF':
+        formats.clear()
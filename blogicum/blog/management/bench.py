@@ -0,0 +1,28 @@
+"""Общие части команд-бенчмарков."""
+import math
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Выполняет блок в транзакции и откатывает всё, что он записал."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def percentile(sorted_values, percent):
+    """Перцентиль по ближайшему рангу для отсортированного списка."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
@@ -0,0 +1,122 @@
+"""Массовая вставка строк для команды `bulkload`.
+
+Объекты копятся в буфере по моделям и записываются пачками
+многострочных `INSERT` — по транзакции на буфер. Как и `loaddata`,
+вставка идёт в режиме raw: поля сохраняют значения из источника
+(`auto_now_add` не перезаписывает `created_at`), сигналы не рассылаются.
+"""
+import json
+import time
+from collections import Counter, defaultdict
+
+from django.db import connections, transaction
+
+READ_SIZE = 1 << 20
+
+
+def iter_json_objects(file):
+    """Читает объекты из JSON-массива или JSON Lines по частям, не
+    загружая файл в память целиком.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    while True:
+        # Пропускаем пробелы и разделители массива.
+        while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+            position += 1
+        if position == len(buffer):
+            if eof:
+                return
+            buffer, position = file.read(READ_SIZE), 0
+            eof = not buffer
+            continue
+        try:
+            obj, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(READ_SIZE)
+            if not chunk:
+                raise
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield obj
+        position = end
+
+
+class BulkWriter:
+    def __init__(self, using, batch_size, commit_every,
+                 ignore_conflicts=False):
+        self.using = using
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.ignore_conflicts = ignore_conflicts
+        # Модели записываются в порядке появления: родители раньше детей.
+        self.pending = defaultdict(list)
+        self.pending_m2m = []
+        self.buffered = 0
+        self.counts = Counter()
+        self.started = time.perf_counter()
+
+    def add(self, obj, m2m_data=None):
+        self.pending[type(obj)].append(obj)
+        for field_name, values in (m2m_data or {}).items():
+            self.pending_m2m.append((obj, field_name, values))
+        self.buffered += 1
+        if self.buffered >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        if not self.buffered:
+            return
+        with transaction.atomic(using=self.using):
+            for model, objs in self.pending.items():
+                self.insert(model, objs)
+            self.insert_m2m()
+        self.pending.clear()
+        self.pending_m2m = []
+        self.buffered = 0
+
+    def insert(self, model, objs):
+        opts = model._meta
+        fields = list(opts.concrete_fields)
+        if any(obj.pk is None for obj in objs):
+            fields = [field for field in fields if field != opts.pk]
+        connection = connections[self.using]
+        batch_size = min(
+            self.batch_size,
+            connection.ops.bulk_batch_size(fields, objs) or len(objs))
+        for start in range(0, len(objs), batch_size):
+            model._base_manager._insert(
+                objs[start:start + batch_size],
+                fields=fields,
+                raw=True,
+                using=self.using,
+                ignore_conflicts=self.ignore_conflicts,
+            )
+        self.counts[opts.label] += len(objs)
+
+    def insert_m2m(self):
+        rows = defaultdict(list)
+        for obj, field_name, values in self.pending_m2m:
+            field = obj._meta.get_field(field_name)
+            through = field.remote_field.through
+            source = field.m2m_field_name() + '_id'
+            target = field.m2m_reverse_field_name() + '_id'
+            rows[through].extend(
+                through(**{source: obj.pk, target: value})
+                for value in values
+            )
+        for through, objs in rows.items():
+            self.insert(through, objs)
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        total = sum(self.counts.values())
+        lines = [
+            f'{label:<32}{count:>12}' for label, count in self.counts.items()
+        ]
+        rate = f'{total / max(elapsed, 1e-9):,.0f}'.replace(',', ' ')
+        lines.append(
+            f'Всего строк: {total} за {elapsed:.1f} с, {rate} строк/с')
+        return lines
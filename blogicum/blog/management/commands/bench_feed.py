@@ -0,0 +1,154 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from blog.management.bench import percentile, rolled_back
+from blog.models import Category, Post
+from blog.views import PAGIATE_OF_PAGES, posts_filter
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими публикациями и сравнивает планы и '
+        'время запросов ленты без индексов и с индексами. Все изменения '
+        'откатываются по завершении.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--runs', type=int, default=20,
+                            help='Сколько раз выполнять каждый запрос.')
+        parser.add_argument('--deep-page', type=int, default=500,
+                            help='Номер «дальней» страницы ленты.')
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.seed(options)
+            self.analyze()
+            queries = self.queries(options['deep_page'])
+            with self.indexes_dropped():
+                before = self.measure(queries, options['runs'])
+            after = self.measure(queries, options['runs'])
+            self.report(before, after)
+
+    def seed(self, options):
+        started = time.perf_counter()
+        User.objects.bulk_create(
+            User(username=f'bench_user_{i}')
+            for i in range(options['users'])
+        )
+        Category.objects.bulk_create(
+            Category(
+                title=f'Категория {i}',
+                description='',
+                slug=f'bench-category-{i}',
+                is_published=random.random() > 0.1,
+            )
+            for i in range(options['categories'])
+        )
+        # SQLite не возвращает первичные ключи из bulk_create.
+        users = list(User.objects.filter(username__startswith='bench_user_'))
+        categories = list(
+            Category.objects.filter(slug__startswith='bench-category-'))
+        now = timezone.now()
+        batch = []
+        for i in range(options['posts']):
+            pub_date = now - timedelta(
+                minutes=random.randint(-60 * 24 * 30, 60 * 24 * 365 * 5))
+            is_published = random.random() > 0.05
+            batch.append(Post(
+                title=f'Публикация {i}',
+                text='Текст публикации',
+                pub_date=pub_date,
+                author=random.choice(users),
+                category=random.choice(categories),
+                is_published=is_published,
+                # bulk_create не вызывает Post.save().
+                is_visible=is_published and pub_date <= now,
+            ))
+            if len(batch) == 10000:
+                Post.objects.bulk_create(batch)
+                batch = []
+        Post.objects.bulk_create(batch)
+        self.stdout.write(
+            f'Создано публикаций: {options["posts"]} '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
+        self.category = next(
+            category for category in categories if category.is_published)
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def queries(self, deep_page):
+        offset = (deep_page - 1) * PAGIATE_OF_PAGES
+        category_posts = posts_filter().filter(category=self.category)
+        return {
+            'лента, страница 1': posts_filter()[:PAGIATE_OF_PAGES],
+            f'лента, страница {deep_page}': (
+                posts_filter()[offset:offset + PAGIATE_OF_PAGES]),
+            'лента, COUNT(*)': posts_filter().values('pk'),
+            'категория, страница 1': category_posts[:PAGIATE_OF_PAGES],
+        }
+
+    def measure(self, queries, runs):
+        results = {}
+        for name, queryset in queries.items():
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                if name.endswith('COUNT(*)'):
+                    queryset.count()
+                else:
+                    list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[name] = {
+                'plan': queryset.explain(),
+                'p50': percentile(timings, 50),
+                'p95': percentile(timings, 95),
+            }
+        return results
+
+    @contextmanager
+    def indexes_dropped(self):
+        self.toggle_indexes(drop=True)
+        try:
+            yield
+        finally:
+            self.toggle_indexes(drop=False)
+
+    def toggle_indexes(self, drop):
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model in (Post, Category):
+                for index in model._meta.indexes:
+                    statement = (
+                        index.remove_sql(model, editor) if drop
+                        else index.create_sql(model, editor)
+                    )
+                    cursor.execute(str(statement))
+        self.analyze()
+
+    def report(self, before, after):
+        for name in before:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for title, result in (('без индексов', before[name]),
+                                  ('с индексами', after[name])):
+                self.stdout.write(
+                    f'  {title}: p50 {result["p50"]:.2f} мс, '
+                    f'p95 {result["p95"]:.2f} мс'
+                )
+                for line in result['plan'].splitlines():
+                    self.stdout.write(f'    {line}')
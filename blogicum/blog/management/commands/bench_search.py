@@ -0,0 +1,121 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from blog.management.bench import percentile, rolled_back
+from blog.models import Category, Post
+from blog.search import SQLiteFTSBackend
+from blog.views import PAGIATE_OF_PAGES
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими публикациями со случайным текстом '
+        'и замеряет время поиска FTS5: подсчёт и первая страница '
+        'результатов. Все изменения откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--words', type=int, default=20_000,
+                            help='Размер словаря текстов.')
+        parser.add_argument('--runs', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write('Бенчмарк рассчитан на индекс FTS5 в SQLite.')
+            return
+        with rolled_back():
+            vocabulary = self.seed(options)
+            self.report(self.measure(vocabulary, options['runs']))
+
+    def seed(self, options):
+        started = time.perf_counter()
+        vocabulary = self.vocabulary(options['words'])
+        # Частоты слов в текстах как у живого языка: немногие слова
+        # встречаются почти везде, большинство — редко.
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+        author = User.objects.create(username='bench_search_user')
+        category = Category.objects.create(
+            title='Поиск', description='', slug='bench-search')
+        now = timezone.now()
+        batch = []
+        for i in range(options['posts']):
+            words = random.choices(vocabulary, weights, k=60)
+            batch.append(Post(
+                title=' '.join(words[:5]).capitalize(),
+                text=' '.join(words[5:]),
+                pub_date=now,
+                author=author,
+                category=category,
+                is_visible=True,
+            ))
+            if len(batch) == 10000:
+                Post.objects.bulk_create(batch)
+                batch = []
+        Post.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {SQLiteFTSBackend.table} (rowid, title, text) '
+                'SELECT id, title, text FROM blog_post WHERE category_id = %s',
+                [category.pk])
+            cursor.execute(
+                f"INSERT INTO {SQLiteFTSBackend.table} "
+                f"({SQLiteFTSBackend.table}) VALUES ('optimize')")
+        self.stdout.write(
+            f'Создано и проиндексировано публикаций: {options["posts"]} '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
+        return vocabulary
+
+    @staticmethod
+    def vocabulary(size):
+        """Случайные «слова» из русских слогов."""
+        syllables = [c + v for c in 'бвгдзклмнпрстфх' for v in 'аеиоуяю']
+        words = set()
+        while len(words) < size:
+            words.add(''.join(random.choices(
+                syllables, k=random.randint(2, 4))))
+        return list(words)
+
+    def measure(self, vocabulary, runs):
+        backend = SQLiteFTSBackend()
+        queries = {
+            'частое слово': vocabulary[0],
+            'слово средней частоты': vocabulary[len(vocabulary) // 100],
+            'редкое слово': vocabulary[-1],
+            'два слова': f'{vocabulary[5]} {vocabulary[50]}',
+            'префикс': vocabulary[len(vocabulary) // 10][:3],
+        }
+        results = {}
+        for name, query in queries.items():
+            timings = {'count': [], 'page': []}
+            for _ in range(runs):
+                started = time.perf_counter()
+                total = backend.count(query)
+                timings['count'].append(
+                    (time.perf_counter() - started) * 1000)
+                started = time.perf_counter()
+                backend.search(query, 0, PAGIATE_OF_PAGES)
+                timings['page'].append(
+                    (time.perf_counter() - started) * 1000)
+            results[f'{name} «{query}», найдено {total}'] = {
+                step: sorted(values) for step, values in timings.items()}
+        return results
+
+    def report(self, results):
+        for name, timings in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for step, title in (('count', 'подсчёт'),
+                                ('page', 'первая страница')):
+                values = timings[step]
+                self.stdout.write(
+                    f'  {title}: p50 {percentile(values, 50):.2f} мс, '
+                    f'p95 {percentile(values, 95):.2f} мс'
+                )
@@ -0,0 +1,166 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from blog.management.bench import percentile
+from blog.models import Post
+from blog.sqlite import apply_pragmas
+from blog.views import PAGIATE_OF_PAGES, posts_filter
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет чтение первой страницы ленты, пока другие потоки '
+        'добавляют комментарии: с настройками SQLite по умолчанию и с '
+        'профилем BLOG_SQLITE_PRAGMAS. Замер идёт на копиях текущей '
+        'базы во временном каталоге.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5,
+                            help='Длительность замера каждого профиля, с.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Бенчмарк рассчитан на SQLite.')
+        self.post_ids = list(Post.objects.filter(
+            is_visible=True).values_list('pk', flat=True)[:1000])
+        self.user_id = User.objects.values_list('pk', flat=True).first()
+        if not self.post_ids or self.user_id is None:
+            raise CommandError(
+                'В базе нет публикаций: загрузите данные, например '
+                '`bulkload --synthetic`.')
+        sql, self.feed_params = posts_filter()[
+            :PAGIATE_OF_PAGES].query.sql_with_params()
+        self.feed_sql = sql.replace('%s', '?')
+        profiles = (
+            ('по умолчанию', {'journal_mode': 'delete'}, False, 5),
+            ('профиль', settings.BLOG_SQLITE_PRAGMAS,
+             settings.BLOG_SQLITE_IMMEDIATE,
+             connection.settings_dict['OPTIONS'].get('timeout', 5)),
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for number, (title, pragmas, immediate, timeout) in enumerate(
+                    profiles):
+                path = os.path.join(directory, f'{number}.sqlite3')
+                self.copy_database(path, pragmas)
+                self.report(title, self.run(
+                    path, pragmas, immediate, timeout, options))
+
+    def copy_database(self, path, pragmas):
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            connection.connection.backup(target)
+            # Режим журнала хранится в файле: переключаем его один раз,
+            # а не в каждом потоке.
+            apply_pragmas(target.cursor(), pragmas)
+        finally:
+            target.close()
+
+    def run(self, path, pragmas, immediate, timeout, options):
+        self.path, self.pragmas = path, pragmas
+        self.immediate, self.timeout = immediate, timeout
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.results = {'reads': [], 'writes': 0, 'errors': 0}
+        threads = (
+            [threading.Thread(target=self.reader)
+             for _ in range(options['readers'])]
+            + [threading.Thread(target=self.writer)
+               for _ in range(options['writers'])]
+        )
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        self.results['duration'] = options['duration']
+        return self.results
+
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=self.timeout,
+                             isolation_level=None,
+                             check_same_thread=False)
+        apply_pragmas(db.cursor(), {
+            name: value for name, value in self.pragmas.items()
+            if name != 'journal_mode'
+        })
+        return db
+
+    def reader(self):
+        db = self.connect()
+        timings, errors = [], 0
+        while not self.stop.is_set():
+            started = time.perf_counter()
+            try:
+                db.execute(self.feed_sql, self.feed_params).fetchall()
+            except sqlite3.OperationalError:
+                errors += 1
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+        with self.lock:
+            self.results['reads'].extend(timings)
+            self.results['errors'] += errors
+
+    def writer(self):
+        db = self.connect()
+        writes, errors = 0, 0
+        created_at = connection.ops.adapt_datetimefield_value(
+            timezone.now())
+        while not self.stop.is_set():
+            try:
+                self.add_comment(db, created_at)
+                writes += 1
+            except sqlite3.OperationalError:
+                if db.in_transaction:
+                    db.execute('ROLLBACK')
+                errors += 1
+        with self.lock:
+            self.results['writes'] += writes
+            self.results['errors'] += errors
+
+    def add_comment(self, db, created_at):
+        # Как CommentCreateView: проверка поста, комментарий и счётчик
+        # в одной транзакции.
+        post_id = random.choice(self.post_ids)
+        db.execute('BEGIN IMMEDIATE' if self.immediate else 'BEGIN')
+        db.execute('SELECT id FROM blog_post WHERE id = ?',
+                   (post_id,)).fetchone()
+        db.execute(
+            'INSERT INTO blog_comment '
+            '(text, post_id, author_id, is_published, '
+            'created_at) VALUES (?, ?, ?, 1, ?)',
+            ('Комментарий', post_id, self.user_id, created_at))
+        db.execute(
+            'UPDATE blog_post SET comment_count = '
+            'comment_count + 1 WHERE id = ?', (post_id,))
+        db.execute('COMMIT')
+
+    def report(self, title, results):
+        reads = sorted(results['reads'])
+        duration = results['duration']
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(
+            f'  чтение: {len(reads) / duration:.0f} запросов/с, '
+            f'p50 {percentile(reads, 50) or 0:.2f} мс, '
+            f'p95 {percentile(reads, 95) or 0:.2f} мс'
+        )
+        self.stdout.write(
+            f'  запись: {results["writes"] / duration:.0f} комментариев/с')
+        self.stdout.write(
+            f'  ошибок «database is locked»: {results["errors"]}')
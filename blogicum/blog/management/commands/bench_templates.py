@@ -0,0 +1,85 @@
+import copy
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from blog.management.bench import percentile
+from blog.models import Post
+from blogicum.warmup import warm_up_templates
+
+RENDER_RE = re.compile(r'render;dur=([\d.]+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендеринга страниц на данных текущей базы: '
+        'без кэша шаблонов, с кэшем и с кэшем, прогретым при старте. '
+        'Страницы и карточки публикаций не кэшируются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Запросов на каждую страницу.')
+
+    def handle(self, *args, **options):
+        urls = self.urls()
+        for title, templates, warm_up in (
+            ('без кэша шаблонов', self.uncached_templates(), False),
+            ('кэш шаблонов', settings.TEMPLATES, False),
+            ('кэш шаблонов, прогрев', settings.TEMPLATES, True),
+        ):
+            # Смена TEMPLATES пересоздаёт движки шаблонов с пустым кэшем.
+            with override_settings(
+                    TEMPLATES=templates, DEBUG=False,
+                    ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                    BLOG_PAGE_CACHE_TIMEOUT=0, BLOG_CARD_CACHE_TIMEOUT=0):
+                if warm_up:
+                    warm_up_templates()
+                self.stdout.write(self.style.MIGRATE_HEADING(title))
+                for url in urls:
+                    self.measure(url, options['requests'])
+
+    def uncached_templates(self):
+        templates = copy.deepcopy(settings.TEMPLATES)
+        for engine in templates:
+            loaders = engine['OPTIONS'].get('loaders', [])
+            engine['OPTIONS']['loaders'] = [
+                loader for entry in loaders
+                for loader in (
+                    entry[1] if entry[0].endswith('cached.Loader')
+                    else [entry]
+                )
+            ]
+        return templates
+
+    def urls(self):
+        post = Post.objects.filter(
+            is_visible=True, category__is_published=True
+        ).select_related('category', 'author').order_by('-pub_date').first()
+        if post is None:
+            raise CommandError('В базе нет опубликованных постов.')
+        return (
+            '/', f'/category/{post.category.slug}/', f'/posts/{post.pk}/',
+            f'/profile/{post.author.username}/', '/pages/about/',
+        )
+
+    def measure(self, url, requests):
+        client = Client()
+        timings = []
+        for _ in range(requests):
+            cache.clear()
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{url}: ответ {response.status_code}')
+            timings.append(float(
+                RENDER_RE.search(response['Server-Timing']).group(1)))
+        first, rest = timings[0], sorted(timings[1:])
+        self.stdout.write(
+            f'  {url}: первый рендеринг {first:.2f} мс, '
+            f'далее p50 {percentile(rest, 50) or 0:.2f} мс, '
+            f'p95 {percentile(rest, 95) or 0:.2f} мс'
+        )
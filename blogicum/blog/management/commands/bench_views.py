@@ -0,0 +1,129 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from blog.management.bench import percentile, rolled_back
+
+PERCENTILES = (50, 90, 99)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку и число SQL-запросов страниц блога на '
+        'синтетических данных и сохраняет перцентили в JSON-отчёт. '
+        'Данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=300)
+        parser.add_argument('--comments', type=int, default=100,
+                            help='Комментариев у замеряемой публикации.')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Запросов на каждую страницу.')
+        parser.add_argument('--output', type=Path,
+                            default=Path('bench_views.json'))
+        parser.add_argument('--compare', type=Path,
+                            help='Отчёт предыдущего прогона для сравнения.')
+
+    def handle(self, *args, **options):
+        # Замеры ведутся в продакшен-режиме: без журнала запросов DEBUG.
+        with override_settings(DEBUG=False), rolled_back():
+            scenarios = self.seed(options)
+            report = {
+                'created_at': timezone.now().isoformat(),
+                'requests': options['requests'],
+                'views': {
+                    name: self.measure(client, method, url, data,
+                                       options['requests'])
+                    for name, (client, method, url, data) in scenarios.items()
+                },
+            }
+        options['output'].write_text(
+            json.dumps(report, ensure_ascii=False, indent=2))
+        self.stdout.write(f'Отчёт сохранён в {options["output"]}')
+        baseline = None
+        if options['compare']:
+            baseline = json.loads(options['compare'].read_text())
+        self.print_report(report, baseline)
+
+    def seed(self, options):
+        from mixer.backend.django import mixer
+
+        author = mixer.blend('auth.User')
+        categories = mixer.cycle(10).blend('blog.Category', is_published=True)
+        locations = mixer.cycle(20).blend('blog.Location', is_published=True)
+        posts = mixer.cycle(options['posts']).blend(
+            'blog.Post',
+            author=mixer.SELECT,
+            category=mixer.sequence(*categories),
+            location=mixer.sequence(*locations),
+            is_published=True,
+            pub_date=timezone.now,
+        )
+        post = posts[0]
+        mixer.cycle(options['comments']).blend(
+            'blog.Comment', post=post, author=mixer.SELECT)
+        comment = mixer.blend('blog.Comment', post=post, author=author)
+
+        anonymous = Client(SERVER_NAME='localhost')
+        user = Client(SERVER_NAME='localhost')
+        user.force_login(author)
+        edit_comment = f'/posts/{post.pk}/edit_comment/{comment.pk}/'
+        pages = {
+            'index': '/',
+            'post_detail': f'/posts/{post.pk}/',
+            'profile': f'/profile/{post.author.username}/',
+            'category_posts': f'/category/{post.category.slug}/',
+        }
+        scenarios = {}
+        for name, url in pages.items():
+            scenarios[f'{name}:user'] = (user, 'get', url, None)
+            scenarios[f'{name}:anonymous'] = (anonymous, 'get', url, None)
+        scenarios.update({
+            'add_comment': (
+                user, 'post', f'/posts/{post.pk}/comment/',
+                {'text': 'Комментарий'}),
+            'edit_comment:get': (user, 'get', edit_comment, None),
+            'edit_comment:post': (
+                user, 'post', edit_comment, {'text': 'Исправлено'}),
+        })
+        return scenarios
+
+    def measure(self, client, method, url, data, requests):
+        cache.clear()
+        reset_queries()
+        request = getattr(client, method)
+        with CaptureQueriesContext(connection) as queries:
+            request(url, data) if data else request(url)
+        query_count = len(queries)
+        timings = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = request(url, data) if data else request(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        result = {
+            f'p{p}': round(percentile(timings, p), 3) for p in PERCENTILES
+        }
+        result['queries'] = query_count
+        result['status'] = response.status_code
+        return result
+
+    def print_report(self, report, baseline=None):
+        for name, result in report['views'].items():
+            line = f'{name:<26}' + ' '.join(
+                f'p{p} {result[f"p{p}"]:8.2f} мс' for p in PERCENTILES
+            ) + f'  запросов {result["queries"]:3}'
+            previous = (baseline or {}).get('views', {}).get(name)
+            if previous:
+                change = result['p50'] / previous['p50'] * 100 - 100
+                line += (f'  p50 {change:+.0f}%, запросов '
+                         f'{result["queries"] - previous["queries"]:+d}')
+            self.stdout.write(line)
@@ -0,0 +1,194 @@
+import random
+from datetime import timedelta
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.cache import (
+    bump_versions, category_listing, comments_activity, feed_listing,
+    shared_records)
+from blog.management.bulk import BulkWriter, iter_json_objects
+from blog.models import Category, Comment, Location, Post
+from blog.search import get_backend
+
+User = get_user_model()
+
+# Пул сгенерированных Faker текстов: генерировать текст на каждую из
+# миллионов строк заметно дольше самой вставки.
+TEXT_POOL_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает в базу фикстуры JSON (как loaddata, но пачками '
+        'и потоково) или синтетические данные заданного объёма и '
+        'сообщает скорость вставки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixtures', nargs='*',
+                            help='Файлы фикстур: JSON-массив или JSON Lines.')
+        parser.add_argument('--synthetic', action='store_true',
+                            help='Сгенерировать данные вместо фикстур.')
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--comments', type=int, default=400_000)
+        parser.add_argument('--exclude', action='append', default=[],
+                            help='Пропустить модель app_label.Model.')
+        parser.add_argument('--ignore-conflicts', action='store_true',
+                            help='Пропускать строки с уже занятым ключом.')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Строк в одном INSERT.')
+        parser.add_argument('--commit-every', type=int, default=50_000,
+                            help='Строк в одной транзакции.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, fixtures, synthetic, **options):
+        if bool(fixtures) == synthetic:
+            raise CommandError(
+                'Укажите файлы фикстур или --synthetic, но не то и другое.')
+        writer = BulkWriter(
+            options['database'],
+            batch_size=options['batch_size'],
+            commit_every=options['commit_every'],
+            ignore_conflicts=options['ignore_conflicts'],
+        )
+        self.using = options['database']
+        connection = connections[self.using]
+        # Как loaddata: фикстура может ссылаться на строки, которые идут
+        # в ней позже; связи проверяются после загрузки.
+        with connection.constraint_checks_disabled():
+            if synthetic:
+                self.generate(writer, options)
+            else:
+                for path in fixtures:
+                    self.load_fixture(writer, path, options)
+            writer.flush()
+        connection.check_constraints(
+            table_names=[label_table(label) for label in writer.counts])
+        for line in writer.report():
+            self.stdout.write(line)
+        self.finish(recount=not synthetic and (
+            Comment._meta.label in writer.counts))
+
+    def load_fixture(self, writer, path, options):
+        excluded = {label.lower() for label in options['exclude']}
+        with open(path, encoding='utf-8') as file:
+            for data in iter_json_objects(file):
+                if data['model'].lower() in excluded:
+                    continue
+                for deserialized in serializers.deserialize(
+                        'python', [data], using=options['database']):
+                    obj = deserialized.object
+                    if isinstance(obj, Post):
+                        obj.refresh_visibility()
+                        obj.refresh_excerpt()
+                    writer.add(obj, deserialized.m2m_data)
+
+    def generate(self, writer, options):
+        from faker import Faker
+
+        fake = Faker('ru_RU')
+        titles = [fake.sentence(nb_words=4)[:256]
+                  for _ in range(TEXT_POOL_SIZE)]
+        texts = [fake.paragraph(nb_sentences=5)
+                 for _ in range(TEXT_POOL_SIZE)]
+        now = timezone.now()
+        # SQLite не возвращает ключи из многострочного INSERT, поэтому
+        # ключи назначаются заранее, после уже существующих.
+        user_ids = self.add_rows(
+            writer, User, options['users'],
+            lambda pk: User(pk=pk, username=f'user{pk}', password='!',
+                            date_joined=now))
+        category_ids = self.add_rows(
+            writer, Category, options['categories'],
+            lambda pk: Category(pk=pk, title=f'Категория {pk}',
+                                description=random.choice(texts),
+                                slug=f'category-{pk}', created_at=now))
+        location_ids = self.add_rows(
+            writer, Location, options['locations'],
+            lambda pk: Location(pk=pk, name=f'Место {pk}', created_at=now))
+        location_ids.append(None)
+
+        comments_left = options['comments']
+        next_comment = next_pk(Comment, self.using)
+        first_post = next_pk(Post, self.using)
+        last_post = first_post + options['posts']
+        for pk in range(first_post, last_post):
+            posts_left = last_post - pk
+            comment_count = min(
+                comments_left,
+                random.randint(0, 2 * comments_left // posts_left))
+            # Часть постов отложена на неделю вперёд.
+            pub_date = now - timedelta(minutes=random.randint(
+                -60 * 24 * 7, 60 * 24 * 365 * 3))
+            post = Post(
+                pk=pk,
+                title=random.choice(titles),
+                text=random.choice(texts),
+                pub_date=pub_date,
+                author_id=random.choice(user_ids),
+                category_id=random.choice(category_ids),
+                location_id=random.choice(location_ids),
+                created_at=min(pub_date, now),
+                comment_count=comment_count,
+            )
+            post.refresh_visibility()
+            post.refresh_excerpt()
+            writer.add(post)
+            for comment_pk in range(next_comment,
+                                    next_comment + comment_count):
+                writer.add(Comment(
+                    pk=comment_pk,
+                    text=random.choice(titles),
+                    post_id=pk,
+                    author_id=random.choice(user_ids),
+                    created_at=min(pub_date, now),
+                ))
+            next_comment += comment_count
+            comments_left -= comment_count
+
+    def add_rows(self, writer, model, count, build):
+        first = next_pk(model, self.using)
+        ids = list(range(first, first + count))
+        for pk in ids:
+            writer.add(build(pk))
+        if not ids:
+            ids = list(model.objects.using(self.using).values_list(
+                'pk', flat=True))
+            if not ids:
+                raise CommandError(
+                    f'Нет строк {model._meta.label} для связей.')
+        return ids
+
+    def finish(self, recount):
+        """Обновляет то, что при обычном сохранении делают сигналы."""
+        if recount:
+            call_command('recount_comments', database=self.using,
+                         stdout=self.stdout)
+        get_backend(self.using).rebuild()
+        bump_versions({
+            feed_listing(),
+            shared_records(),
+            comments_activity(),
+            *(category_listing(pk)
+              for pk in Category.objects.using(self.using).values_list(
+                  'pk', flat=True)),
+        })
+
+
+def next_pk(model, using):
+    last = model.objects.using(using).aggregate(last=Max('pk'))['last']
+    return (last or 0) + 1
+
+
+def label_table(label):
+    return apps.get_model(label)._meta.db_table
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import CHUNK_SIZE, EXPORTS, FORMATS, Export, parse_since
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает публикации или комментарии в JSON Lines или '
+        'CSV. С --since выгружаются только строки, добавленные позже '
+        'метки; метка для следующего запуска выводится в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=EXPORTS)
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument('--since',
+                            help='Метка created_at в ISO 8601.')
+        parser.add_argument('--output', '-o',
+                            help='Файл выгрузки; по умолчанию stdout.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Строк, читаемых из базы за раз.')
+
+    def handle(self, *args, kind, since, output, chunk_size, **options):
+        try:
+            since = since and parse_since(since)
+        except ValueError as e:
+            raise CommandError(e)
+        export = Export(kind, options['format'], since or None, chunk_size)
+        if output:
+            # newline='' — переводы строк в CSV расставляет csv.writer.
+            with open(output, 'w', encoding='utf-8', newline='') as file:
+                for block in export:
+                    file.write(block)
+        else:
+            for block in export:
+                self.stdout.write(block, ending='')
+        watermark = export.watermark.isoformat() if export.watermark else '-'
+        self.stderr.write(
+            f'Выгружено строк: {export.count}, метка: {watermark}')
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from blog.management.bench import percentile
+from blog.models import Post
+
+PERCENTILES = (50, 95, 99)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест ленты, категории и страницы публикации на '
+        'данных текущей базы: синхронные представления через WSGI-обработчик '
+        'и асинхронные через ASGI-обработчик при одинаковой конкурентности.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=('wsgi', 'asgi', 'both'),
+                            default='both')
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Запросов на каждую страницу.')
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Не кэшировать страницы и карточки публикаций.')
+
+    def handle(self, *args, mode, **options):
+        if mode == 'both':
+            # Выбор обработчиков происходит при загрузке urls.py, поэтому
+            # каждый режим запускается в своём процессе.
+            for mode in ('wsgi', 'asgi'):
+                self.run_in_subprocess(mode, options)
+            return
+        if (mode == 'asgi') != settings.BLOG_ASYNC_VIEWS:
+            raise CommandError(
+                'Режим asgi требует BLOG_ASYNC_VIEWS=1, wsgi — его '
+                'отсутствия. Запустите команду с --mode both.')
+        timeouts = {}
+        if options['cold']:
+            timeouts = {'BLOG_PAGE_CACHE_TIMEOUT': 0,
+                        'BLOG_CARD_CACHE_TIMEOUT': 0}
+        # Тестовые клиенты приходят с хостом testserver.
+        allowed_hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with override_settings(
+                DEBUG=False, ALLOWED_HOSTS=allowed_hosts, **timeouts):
+            for url in self.urls():
+                run = self.run_asgi if mode == 'asgi' else self.run_wsgi
+                started = time.perf_counter()
+                timings, statuses = run(
+                    url, options['concurrency'], options['requests'])
+                elapsed = time.perf_counter() - started
+                self.report(mode, url, timings, statuses, elapsed)
+
+    def run_in_subprocess(self, mode, options):
+        env = dict(os.environ, BLOG_ASYNC_VIEWS='1' if mode == 'asgi' else '')
+        command = [
+            sys.executable, sys.argv[0], 'loadtest', '--mode', mode,
+            '--concurrency', str(options['concurrency']),
+            '--requests', str(options['requests']),
+        ]
+        if options['cold']:
+            command.append('--cold')
+        subprocess.run(command, env=env, check=True)
+
+    def urls(self):
+        post = Post.objects.filter(
+            is_visible=True, category__is_published=True
+        ).select_related('category').order_by('-pub_date').first()
+        if post is None:
+            raise CommandError('В базе нет опубликованных постов.')
+        return ('/', f'/category/{post.category.slug}/', f'/posts/{post.pk}/')
+
+    def run_wsgi(self, url, concurrency, requests):
+        def worker(count):
+            client = Client()
+            timings, statuses = [], []
+            for _ in range(count):
+                started = time.perf_counter()
+                statuses.append(client.get(url).status_code)
+                timings.append((time.perf_counter() - started) * 1000)
+            return timings, statuses
+
+        with ThreadPoolExecutor(concurrency) as executor:
+            results = list(executor.map(
+                worker, self.split(requests, concurrency)))
+        return self.merge(results)
+
+    def run_asgi(self, url, concurrency, requests):
+        async def worker(count):
+            client = AsyncClient()
+            timings, statuses = [], []
+            for _ in range(count):
+                started = time.perf_counter()
+                statuses.append((await client.get(url)).status_code)
+                timings.append((time.perf_counter() - started) * 1000)
+            return timings, statuses
+
+        async def main():
+            return await asyncio.gather(*(
+                worker(count) for count in self.split(requests, concurrency)
+            ))
+
+        return self.merge(asyncio.run(main()))
+
+    @staticmethod
+    def split(requests, concurrency):
+        share, rest = divmod(requests, concurrency)
+        return [share + (i < rest) for i in range(concurrency)]
+
+    @staticmethod
+    def merge(results):
+        timings = sorted(t for worker, _ in results for t in worker)
+        statuses = {s for _, worker in results for s in worker}
+        return timings, statuses
+
+    def report(self, mode, url, timings, statuses, elapsed):
+        line = f'{mode:<5}{url:<32}{len(timings) / elapsed:8.1f} запр/с  '
+        line += ' '.join(
+            f'p{p} {percentile(timings, p):8.2f} мс' for p in PERCENTILES)
+        if statuses != {200}:
+            line += f'  статусы {sorted(statuses)}'
+        self.stdout.write(line)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import process_post_image
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит уменьшенные копии фото публикаций, загруженных до '
+        'появления фоновой обработки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Обработать заново и уже готовые фото.')
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(image_info={})
+        processed = failed = 0
+        for post_id in posts.values_list('pk', flat=True).iterator():
+            try:
+                process_post_image(post_id)
+            except (OSError, ValueError) as e:
+                failed += 1
+                self.stderr.write(f'Публикация {post_id}: {e}')
+            else:
+                processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано фото: {processed}, с ошибками: {failed}'))
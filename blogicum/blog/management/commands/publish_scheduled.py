@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.publication import next_pub_date, publish_due_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Открывает отложенные публикации, дата которых наступила, и '
+        'сбрасывает кэш затронутых страниц. С --loop работает как '
+        'фоновый процесс.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Не завершаться, проверять очередь снова.')
+        parser.add_argument(
+            '--interval', type=float, default=60,
+            help='Наибольшая пауза между проверками, секунды.')
+
+    def handle(self, *args, loop, interval, **options):
+        while True:
+            published = publish_due_posts()
+            if published or options['verbosity'] > 1:
+                self.stdout.write(f'Открыто публикаций: {len(published)}')
+            if not loop:
+                return
+            time.sleep(self.pause(interval))
+
+    def pause(self, interval):
+        """Спит до ближайшей отложенной публикации, но не дольше
+        `interval`: посты могут добавить или перенести в любой момент.
+        """
+        upcoming = next_pub_date()
+        if upcoming is None:
+            return interval
+        return min(max((upcoming - timezone.now()).total_seconds(), 0.5),
+                   interval)
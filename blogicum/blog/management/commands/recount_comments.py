@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое число комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Сколько публикаций обновлять в одной транзакции.')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, batch_size, database, **options):
+        counts = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+        posts = Post.objects.using(database)
+        last_pk = posts.aggregate(last=Max('pk'))['last'] or 0
+        updated = 0
+        for start in range(0, last_pk, batch_size):
+            with transaction.atomic(using=database):
+                updated += posts.filter(
+                    pk__gt=start, pk__lte=start + batch_size,
+                ).update(comment_count=Coalesce(Subquery(counts), 0))
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано публикаций: {updated}'))
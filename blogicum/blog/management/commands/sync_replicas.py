@@ -0,0 +1,42 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из BLOG_DB_REPLICAS — '
+        'замена репликации для локальной проверки. С --loop повторяет '
+        'копирование, как отстающая реплика.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Не завершаться, копировать снова.')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Пауза между копированиями, секунды.')
+
+    def handle(self, *args, loop, interval, **options):
+        if not settings.BLOG_DB_REPLICAS:
+            raise CommandError('Реплики не заданы: BLOG_DB_REPLICAS пуст.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Команда копирует только базы SQLite.')
+        while True:
+            primary.ensure_connection()
+            for alias in settings.BLOG_DB_REPLICAS:
+                target = sqlite3.connect(connections[alias].settings_dict[
+                    'NAME'])
+                try:
+                    primary.connection.backup(target)
+                finally:
+                    target.close()
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f'Скопировано в реплики: {len(settings.BLOG_DB_REPLICAS)}')
+            if not loop:
+                return
+            time.sleep(interval)
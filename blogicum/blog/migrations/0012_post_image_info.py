@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_info',
+            field=models.JSONField(default=dict, editable=False, help_text='Размеры и уменьшенные копии; заполняется фоновой обработкой после загрузки фото.', verbose_name='Сведения о фото'),
+        ),
+    ]
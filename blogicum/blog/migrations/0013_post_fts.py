@@ -0,0 +1,38 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+    "title, text, tokenize = 'unicode61 remove_diacritics 2')",
+    # Заголовок весит больше текста; ORDER BY rank использует эту формулу.
+    "INSERT INTO blog_post_fts (blog_post_fts, rank) "
+    "VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO blog_post_fts (rowid, title, text) "
+    "SELECT p.id, p.title, p.text FROM blog_post p "
+    "JOIN blog_category c ON c.id = p.category_id "
+    "WHERE p.is_visible AND c.is_published",
+)
+
+
+def create_fts_index(apps, schema_editor):
+    # Индекс FTS5 есть только в SQLite; для других баз поиск работает
+    # через свой бэкенд (см. blog.search).
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE blog_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_image_info'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
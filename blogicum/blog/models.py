@@ -1,9 +1,19 @@
-from django.db import models
+from django.db import models, transaction
 
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.text import Truncator
 
 User = get_user_model()
 
+# Число слов текста в карточке публикации.
+EXCERPT_WORDS = 10
+
+
+def make_excerpt(text):
+    """Начало текста для карточки; то же, что `truncatewords`."""
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
 
 class PublishedModel(models.Model):
     is_published = models.BooleanField(
@@ -32,6 +42,12 @@ class Category(PublishedModel):
     class Meta:
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
+        indexes = (
+            # Проверка is_published при соединении с лентой без чтения
+            # самой строки категории.
+            models.Index(fields=('id', 'is_published'),
+                         name='category_published_idx'),
+        )
 
     def __str__(self):
         return self.title
@@ -55,6 +71,13 @@ class Post(PublishedModel):
 
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Начало текста',
+        help_text='Первые слова текста для карточки в ленте; '
+        'заполняется при сохранении.',
+    )
     pub_date = models.DateTimeField(verbose_name='Дата и время публикации',
                                     help_text='Если установить дату и время '
                                     'в будущем — можно делать отложенные '
@@ -85,15 +108,101 @@ class Post(PublishedModel):
         verbose_name='Фото',
         upload_to='post_images/',
         blank=True,)
+    image_info = models.JSONField(
+        default=dict,
+        editable=False,
+        verbose_name='Сведения о фото',
+        help_text='Размеры и уменьшенные копии; заполняется фоновой '
+        'обработкой после загрузки фото.',
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден читателям',
+        help_text='Опубликован и дата публикации наступила; отложенные '
+        'посты открывает команда publish_scheduled.',
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
+        indexes = (
+            # Лента и страница категории: только опубликованные посты,
+            # от новых к старым.
+            models.Index(fields=('-pub_date',),
+                         condition=models.Q(is_visible=True),
+                         name='post_visible_feed_idx'),
+            models.Index(fields=('category', '-pub_date'),
+                         condition=models.Q(is_visible=True),
+                         name='post_visible_category_idx'),
+            # Очередь отложенных публикаций.
+            models.Index(fields=('pub_date',),
+                         condition=models.Q(is_published=True,
+                                            is_visible=False),
+                         name='post_scheduled_idx'),
+            # Страница профиля.
+            models.Index(fields=('author', '-pub_date'),
+                         name='post_author_feed_idx'),
+        )
 
     def __str__(self):
         return self.title
 
+    @property
+    def image_width(self):
+        return self.image_info.get('width')
+
+    @property
+    def image_height(self):
+        return self.image_info.get('height')
+
+    @property
+    def image_variants(self):
+        return self.image_info.get('variants', [])
+
+    def image_srcset(self, fmt):
+        storage = self.image.storage
+        return ', '.join(
+            f'{storage.url(variant["name"])} {variant["width"]}w'
+            for variant in self.image_variants
+            if variant['format'] == fmt
+        )
+
+    @property
+    def image_webp_srcset(self):
+        return self.image_srcset('webp')
+
+    @property
+    def image_jpeg_srcset(self):
+        return self.image_srcset('jpeg')
+
+    def refresh_visibility(self):
+        """Пересчитывает `is_visible`; для вставки в обход `save()`."""
+        self.is_visible = (
+            self.is_published and self.pub_date <= timezone.now())
+
+    def refresh_excerpt(self):
+        """Пересчитывает `excerpt`; для вставки в обход `save()`."""
+        self.excerpt = make_excerpt(self.text)
+
+    def save(self, *args, **kwargs):
+        self.refresh_visibility()
+        update_fields = kwargs.get('update_fields')
+        # Списки загружают посты без текста; его не меняли.
+        if 'text' not in self.get_deferred_fields():
+            self.refresh_excerpt()
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'is_visible'}
+            if 'text' in update_fields:
+                kwargs['update_fields'].add('excerpt')
+        super().save(*args, **kwargs)
+
 
 class Comment(PublishedModel):
     text = models.TextField(
@@ -112,3 +221,12 @@ class Comment(PublishedModel):
 
     def __str__(self):
         return self.author
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        # `post_save`, который увеличивает `comment_count`, вызывается уже
+        # после транзакции `save_base`: комментарий и счётчик пишутся
+        # вместе. Удаление и так выполняет `post_delete` в транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
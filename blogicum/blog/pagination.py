@@ -0,0 +1,146 @@
+"""Курсорная (keyset) пагинация.
+
+Вместо `OFFSET` и `COUNT(*)` страница выбирается условием по ключу
+сортировки последней показанной записи, поэтому дальние страницы
+стоят столько же, сколько первая.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage:
+    """Страница курсорной пагинации.
+
+    Повторяет ту часть интерфейса `django.core.paginator.Page`, которой
+    пользуются шаблоны; общего числа страниц у неё нет.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page of %s objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинатор по уникальному ключу сортировки, например
+    `('-pub_date', '-id')`.
+
+    Курсор — непрозрачная строка с значениями ключа крайней записи
+    страницы и направлением перехода.
+    """
+
+    def __init__(self, object_list, per_page, ordering):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        opts = object_list.model._meta
+        self._fields = [
+            opts.get_field(name.lstrip('-')) for name in self.ordering
+        ]
+
+    def _field_names(self):
+        return [field.attname for field in self._fields]
+
+    def encode_cursor(self, obj, reverse=False):
+        values = [
+            field.value_to_string(obj) for field in self._fields
+        ]
+        payload = json.dumps({'v': values, 'r': reverse},
+                             separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode())
+        return token.decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padding = '=' * (-len(token) % 4)
+            payload = json.loads(
+                base64.urlsafe_b64decode(token + padding).decode())
+            values = payload['v']
+            reverse = bool(payload['r'])
+            if len(values) != len(self._fields):
+                raise ValueError
+            values = [
+                field.to_python(value)
+                for field, value in zip(self._fields, values)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error,
+                ValidationError):
+            raise InvalidCursor('Некорректный курсор')
+        return values, reverse
+
+    def _seek(self, values, reverse):
+        """Условие «строго после `values`» в порядке обхода."""
+        condition = Q()
+        names = self._field_names()
+        for i, name in enumerate(self.ordering):
+            descending = name.startswith('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            step = Q(**{f'{names[i]}__{lookup}': values[i]})
+            for prev_name, prev_value in zip(names[:i], values[:i]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    def page(self, cursor=None):
+        ordering = self.ordering
+        queryset = self.object_list
+        reverse = False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._seek(values, reverse))
+            if reverse:
+                ordering = tuple(
+                    name[1:] if name.startswith('-') else '-' + name
+                    for name in ordering
+                )
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=(
+                self.encode_cursor(rows[-1]) if has_next and rows else None),
+            previous_cursor=(
+                self.encode_cursor(rows[0], reverse=True)
+                if has_previous and rows else None),
+        )
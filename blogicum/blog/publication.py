@@ -0,0 +1,37 @@
+"""Открытие отложенных публикаций.
+
+Лента выбирает посты по сохранённому признаку `Post.is_visible`, а не
+по сравнению `pub_date` с текущим временем. Признак выставляется при
+сохранении поста, а для отложенных — командой `publish_scheduled`,
+когда наступает дата публикации.
+"""
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Post
+from .signals import posts_published
+
+
+def scheduled_posts():
+    return Post.objects.filter(is_published=True, is_visible=False)
+
+
+def publish_due_posts(now=None):
+    """Открывает посты с наступившей датой и рассылает
+    `posts_published`. Возвращает список пар `(pk, category_id)`.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        posts = list(scheduled_posts().filter(
+            pub_date__lte=now).values_list('pk', 'category_id'))
+        if posts:
+            Post.objects.filter(
+                pk__in=[pk for pk, _ in posts]).update(is_visible=True)
+    if posts:
+        posts_published.send(sender=Post, posts=posts)
+    return posts
+
+
+def next_pub_date():
+    return scheduled_posts().aggregate(next=Min('pub_date'))['next']
@@ -0,0 +1,72 @@
+"""Чтение страниц блога с реплик базы.
+
+Реплики читают только представления, помеченные `ReplicaReadMixin`:
+лента, категории, профили и страницы публикаций. Остальные запросы,
+в том числе все чтения внутри изменяющих запросов, идут в основную
+базу. Автор, который только что изменил пост или комментарий, получает
+cookie `BLOG_PRIMARY_COOKIE` и `BLOG_REPLICA_LAG` секунд читает с
+основной базы, чтобы сразу увидеть свои изменения. Реплики отдают
+только модели блога: сессии и пользователи всегда читаются с основной
+базы, иначе только что вошедший посетитель на отстающей реплике
+выглядел бы анонимным.
+
+Версии кэша меняются сразу при записи, а реплика может ещё отставать.
+Страница, прочитанная с неё в это время, попала бы в кэш страниц и
+карточек под новыми версиями и осталась бы там до следующего изменения,
+а читатели получили бы устаревший ответ с новым ETag. Поэтому
+`BLOG_REPLICA_LAG` секунд после любой смены версий все читают с
+основной базы, и в кэш попадают только свежие данные.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .cache import bumped_within
+
+read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+@contextmanager
+def replica_reads(request):
+    """Направляет чтения внутри блока на реплику.
+
+    Кроме посетителей с недавними изменениями и всех читателей в первые
+    `BLOG_REPLICA_LAG` секунд после смены версий кэша.
+    """
+    token = read_from_replica.set(
+        bool(settings.BLOG_DB_REPLICAS)
+        and settings.BLOG_PRIMARY_COOKIE not in request.COOKIES
+        and not bumped_within(settings.BLOG_REPLICA_LAG))
+    try:
+        yield
+    finally:
+        read_from_replica.reset(token)
+
+
+def stick_to_primary(response):
+    response.set_cookie(
+        settings.BLOG_PRIMARY_COOKIE, '1',
+        max_age=settings.BLOG_REPLICA_LAG, httponly=True, samesite='Lax')
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != 'blog':
+            return None
+        if settings.BLOG_DB_REPLICAS and read_from_replica.get():
+            return random.choice(settings.BLOG_DB_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, и объекты с разных баз можно
+        # связывать.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.BLOG_DB_REPLICAS
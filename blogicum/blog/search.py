@@ -0,0 +1,196 @@
+"""Полнотекстовый поиск по публикациям.
+
+В индекс попадают только посты, видимые читателям: опубликованные, с
+наступившей датой и в опубликованной категории. Индекс обновляется
+сигналами при изменении постов и категорий, поэтому запрос к нему не
+соединяется с таблицами постов и категорий.
+
+Бэкенд выбирается настройкой `BLOG_SEARCH_BACKEND`; по умолчанию для
+SQLite это FTS5, для остальных баз — `LIKE` без индекса.
+"""
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+WORD_RE = re.compile(r'\w+')
+
+
+def visible_posts(using=DEFAULT_DB_ALIAS):
+    return Post.objects.using(using).filter(
+        is_visible=True, category__is_published=True)
+
+
+class SearchBackend(ABC):
+    """Интерфейс бэкенда поиска.
+
+    Подкласс обязан определить `count` и `search`; индекс обновляют
+    необязательные `update`, `remove` и `rebuild`.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        # Псевдоним базы, в которой лежат посты и индекс.
+        self.using = using
+
+    def update(self, posts):
+        """Добавляет видимые посты в индекс, а скрытые убирает."""
+
+    def remove(self, post_ids):
+        """Убирает посты из индекса."""
+
+    def rebuild(self):
+        """Строит индекс заново, например после массовой загрузки."""
+
+    @abstractmethod
+    def count(self, query):
+        """Сколько постов найдётся по запросу."""
+
+    @abstractmethod
+    def search(self, query, offset, limit):
+        """Id найденных постов, от более подходящих к менее."""
+
+
+class SimpleSearchBackend(SearchBackend):
+    """Поиск `LIKE` по заголовку и тексту, новые посты выше."""
+
+    def matching(self, query):
+        condition = Q()
+        for word in WORD_RE.findall(query):
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        return visible_posts(self.using).filter(condition)
+
+    def count(self, query):
+        return self.matching(query).count()
+
+    def search(self, query, offset, limit):
+        return list(self.matching(query).order_by(
+            '-pub_date').values_list('pk', flat=True)[offset:offset + limit])
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Индекс FTS5 `blog_post_fts`, ранжирование bm25 с весом заголовка.
+
+    Таблицу создаёт миграция `0013_post_fts`.
+    """
+
+    table = 'blog_post_fts'
+
+    def update(self, posts):
+        posts = list(posts)
+        visible = set(visible_posts(self.using).filter(
+            pk__in=[post.pk for post in posts]).values_list('pk', flat=True))
+        self.remove([post.pk for post in posts])
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [(post.pk, post.title, post.text)
+                 for post in posts if post.pk in visible],
+            )
+
+    def rebuild(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, text) '
+                'SELECT p.id, p.title, p.text FROM blog_post p '
+                'JOIN blog_category c ON c.id = p.category_id '
+                'WHERE p.is_visible AND c.is_published')
+
+    def remove(self, post_ids):
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(pk,) for pk in post_ids],
+            )
+
+    @staticmethod
+    def match_expression(query):
+        # Слова ищутся по префиксу; кавычки не дают пользователю
+        # воспользоваться синтаксисом запросов FTS5.
+        return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+    def count(self, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return 0
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM (SELECT rowid FROM {self.table} '
+                f'WHERE {self.table} MATCH %s ORDER BY rowid DESC LIMIT %s)',
+                [expression, settings.BLOG_SEARCH_WINDOW])
+            return cursor.fetchone()[0]
+
+    def search(self, query, offset, limit):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        # bm25 считается для каждого совпадения, и по частым словам
+        # ранжирование всей таблицы заняло бы секунды. Ранжируются только
+        # BLOG_SEARCH_WINDOW самых новых совпадений: FTS5 перебирает их
+        # в порядке rowid и останавливается, так что время запроса не
+        # растёт с размером базы.
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM (SELECT rowid, rank FROM {self.table} '
+                f'WHERE {self.table} MATCH %s ORDER BY rowid DESC LIMIT %s) '
+                'ORDER BY rank LIMIT %s OFFSET %s',
+                [expression, settings.BLOG_SEARCH_WINDOW, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+@lru_cache(maxsize=None)
+def load_backend(path, using):
+    if path is None:
+        path = ('blog.search.SQLiteFTSBackend'
+                if connections[using].vendor == 'sqlite'
+                else 'blog.search.SimpleSearchBackend')
+    return import_string(path)(using)
+
+
+def get_backend(using=DEFAULT_DB_ALIAS):
+    return load_backend(settings.BLOG_SEARCH_BACKEND, using)
+
+
+class SearchResults:
+    """Результаты поиска для `Paginator`: считаются и выбираются
+    постранично, карточки загружаются только для текущей страницы.
+    """
+
+    def __init__(self, query, queryset, backend=None):
+        self.query = query
+        self.queryset = queryset
+        self.backend = backend or get_backend()
+
+    def count(self):
+        return self.backend.count(self.query)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start, stop = item.start or 0, item.stop
+        ids = self.backend.search(self.query, start, stop - start)
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def reindex(queryset, chunk_size=1000):
+    """Обновляет в индексе посты из `queryset` порциями."""
+    backend = get_backend()
+    chunk = []
+    for post in queryset.only('title', 'text').iterator(chunk_size):
+        chunk.append(post)
+        if len(chunk) == chunk_size:
+            backend.update(chunk)
+            chunk = []
+    backend.update(chunk)
@@ -0,0 +1,162 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from .cache import (
+    bump_versions, category_listing, comments_activity, feed_listing,
+    shared_records, version_name)
+from .images import schedule_processing
+from .models import Category, Comment, Location, Post
+from .search import get_backend, reindex
+
+User = get_user_model()
+
+# Поля пользователя, которые выводятся на закэшированных страницах.
+USER_DISPLAYED_FIELDS = ('username', 'first_name', 'last_name')
+
+# Отложенные публикации стали видны читателям; `posts` — список пар
+# `(pk, category_id)`.
+posts_published = Signal()
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    # Публикация могла сменить категорию: сбросить нужно обе страницы.
+    # Новое фото нужно обработать.
+    instance._old_category_id, instance._old_image = (
+        Post.objects.filter(pk=instance.pk).values_list(
+            'category_id', 'image').first()
+        if instance.pk else None
+    ) or (None, None)
+
+
+@receiver(pre_save, sender=Post)
+def fill_computed_fields(sender, instance, raw, **kwargs):
+    # `loaddata` сохраняет посты в обход `Post.save()`.
+    if raw:
+        instance.refresh_visibility()
+        instance.refresh_excerpt()
+
+
+@receiver(post_save, sender=Post)
+def process_new_image(sender, instance, **kwargs):
+    if instance.image and instance.image.name != getattr(
+            instance, '_old_image', None):
+        schedule_processing(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    bump_versions({
+        version_name('post', instance.pk),
+        feed_listing(),
+        category_listing(instance.category_id),
+        category_listing(getattr(instance, '_old_category_id', None)),
+    })
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    get_backend().update([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def index_category_posts(sender, instance, **kwargs):
+    # Снятие категории с публикации скрывает из поиска все её посты.
+    reindex(instance.posts.all())
+
+
+@receiver(post_delete, sender=Category)
+def unindex_category_posts(sender, instance, **kwargs):
+    # Посты удалённой категории остались без неё и скрыты.
+    reindex(Post.objects.filter(category=None))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    bump_versions({
+        version_name('category', instance.pk),
+        feed_listing(),
+        shared_records(),
+    })
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def location_changed(sender, instance, **kwargs):
+    bump_versions({version_name('location', instance.pk), shared_records()})
+
+
+def displayed_fields_saved(update_fields):
+    return update_fields is None or not set(update_fields).isdisjoint(
+        USER_DISPLAYED_FIELDS)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_state(sender, instance, update_fields=None, **kwargs):
+    # Вход обновляет только `last_login`: читать прежние поля незачем.
+    instance._old_displayed = (
+        User.objects.filter(pk=instance.pk).values_list(
+            *USER_DISPLAYED_FIELDS).first()
+        if instance.pk and displayed_fields_saved(update_fields) else None
+    )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Новый пользователь ещё нигде не показан.
+    if created or not displayed_fields_saved(update_fields):
+        return
+    displayed = tuple(
+        getattr(instance, field) for field in USER_DISPLAYED_FIELDS)
+    if displayed != getattr(instance, '_old_displayed', None):
+        user_changed(sender, instance)
+
+
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    bump_versions({version_name('user', instance.pk), shared_records()})
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, raw, **kwargs):
+    # В фикстурах `comment_count` уже посчитан.
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    bump_versions({
+        version_name('post', instance.post_id), comments_activity()})
+
+
+@receiver(posts_published)
+def index_published_posts(sender, posts, **kwargs):
+    reindex(Post.objects.filter(pk__in=[pk for pk, _ in posts]))
+
+
+@receiver(posts_published)
+def scheduled_posts_published(sender, posts, **kwargs):
+    names = {feed_listing()}
+    for pk, category_id in posts:
+        names.add(version_name('post', pk))
+        names.add(category_listing(category_id))
+    bump_versions(names)
@@ -0,0 +1,19 @@
+"""Профиль SQLite для продакшена.
+
+Бэкенд базы `blog.sqlite` — бэкенд SQLite из Django, который к каждому
+новому соединению применяет PRAGMA из `BLOG_SQLITE_PRAGMAS`: журнал
+WAL, при котором читатели не ждут писателя, `synchronous=NORMAL` (в
+режиме WAL не теряет целостность при сбое), отображение файла в память
+и кэш страниц.
+
+С `BLOG_SQLITE_IMMEDIATE` транзакции `atomic()` начинаются с
+`BEGIN IMMEDIATE`. Обычный `BEGIN` берёт блокировку записи только на
+первом изменении, и если другой писатель успел раньше, SQLite сразу
+отвечает «database is locked», не дожидаясь таймаута. Немедленная
+блокировка ждёт своей очереди до таймаута соединения.
+"""
+
+
+def apply_pragmas(cursor, pragmas):
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+from . import apply_pragmas
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        apply_pragmas(conn.cursor(), settings.BLOG_SQLITE_PRAGMAS)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        if settings.BLOG_SQLITE_IMMEDIATE:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            super()._start_transaction_under_autocommit()
@@ -0,0 +1,69 @@
+from django import template
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.utils.safestring import mark_safe
+
+from blog.links import link
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def fragment_cache():
+    # Тот же кэш, что у тега {% cache %}.
+    try:
+        return caches['template_fragments']
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+@register.simple_tag(name='link')
+def link_tag(view_name, *args):
+    """`{% url %}` для маршрутов с позиционными аргументами,
+    без обхода маршрутов: см. `blog.links`.
+    """
+    return link(view_name, *args)
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """HTML карточек страницы публикаций.
+
+    Карточки берутся из кэша одним `get_many`, недостающие рендерятся
+    в контексте страницы без `{% include %}` и сохраняются одним
+    `set_many`. Ключи и содержимое кэша те же, что давал
+    `{% cache card_cache_timeout post_card post.id post.card_version %}`,
+    и карточка выводится ровно в том виде, в каком лежит в кэше.
+    """
+    posts = list(posts)
+    cache = fragment_cache()
+    keys = [
+        make_template_fragment_key(
+            'post_card', [post.id, getattr(post, 'card_version', '')])
+        for post in posts
+    ]
+    cards = cache.get_many(keys)
+    missing = {}
+    card_template = None
+    for key, post in zip(keys, posts):
+        if key in cards:
+            continue
+        if card_template is None:
+            card_template = context.template.engine.get_template(
+                CARD_TEMPLATE)
+        with context.push(
+            post=post,
+            detail_url=link('blog:post_detail', post.id),
+            profile_url=link('blog:profile', post.author.username),
+            category_url=link(
+                'blog:category_posts', post.category.slug
+            ) if post.category else '',
+        ):
+            missing[key] = cards[key] = '\n' + card_template.render(context)
+    timeout = context.get(
+        'card_cache_timeout', settings.BLOG_CARD_CACHE_TIMEOUT)
+    if missing and timeout != 0:
+        cache.set_many(missing, timeout)
+    return [mark_safe(cards[key]) for key in keys]
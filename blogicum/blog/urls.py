@@ -1,13 +1,21 @@
 from django.urls import path
 from . import views
 from django.conf import settings
-# Импортируем функцию, позволяющую серверу разработки отдавать файлы.
-from django.conf.urls.static import static
 app_name = 'blog'
 
+if settings.BLOG_ASYNC_VIEWS:
+    from . import async_views
+    post_list = async_views.post_list
+    post_detail = async_views.post_detail
+    category_posts = async_views.category_posts
+else:
+    post_list = views.PostListView.as_view()
+    post_detail = views.PostDetailView.as_view()
+    category_posts = views.CategoryPostListlView.as_view()
+
 urlpatterns = [
     path('',
-         views.PostListView.as_view(),
+         post_list,
          name='index'),
     path('posts/create/',
          views.PostCreateView.as_view(),
@@ -19,8 +27,17 @@ urlpatterns = [
          views.PostDeleteView.as_view(),
          name='delete_post'),
     path('posts/<int:pk>/',
-         views.PostDetailView.as_view(),
+         post_detail,
          name='post_detail'),
+    path('posts/<int:pk>/comments/',
+         views.PostCommentsView.as_view(),
+         name='post_comments'),
+    path('search/',
+         views.PostSearchView.as_view(),
+         name='search'),
+    path('export/<str:kind>/',
+         views.ExportView.as_view(),
+         name='export'),
     path('profile/edit/',
          views.ProfileEditUpdateView.as_view(),
          name='edit_profile', ),
@@ -28,7 +45,7 @@ urlpatterns = [
          views.ProfileListView.as_view(),
          name='profile'),
     path('category/<slug:category_slug>/',
-         views.CategoryPostListlView.as_view(),
+         category_posts,
          name='category_posts'),
     path('posts/<post_id>/comment/',
          views.CommentCreateView.as_view(),
@@ -39,4 +56,4 @@ urlpatterns = [
     path('posts/<post_id>/delete_comment/<comment_id>/',
          views.CommentDeleteView.as_view(),
          name='delete_comment'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
@@ -1,46 +1,88 @@
+from .cache import (
+    category_listing, comments_activity, feed_listing, get_cached_page,
+    listing_tags, page_etag, post_page_tags, set_cached_page,
+    set_card_versions, shared_records, version_name)
+from .export import EXPORTS, FORMATS, Export, parse_since
 from .forms import PostForm, CommentForm
+from .pagination import CursorPaginator
+from .routers import replica_reads, stick_to_primary
+from .search import SearchResults
 from blog.models import Post, Category, Comment, User
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.http import Http404
+from django.conf import settings
+from django.contrib.auth.mixins import (
+    LoginRequiredMixin, UserPassesTestMixin)
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
-from django.utils import timezone
+from django.utils.http import urlencode
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.views.generic import (
-    CreateView, DetailView, ListView, DeleteView, UpdateView)
+    CreateView, DetailView, ListView, DeleteView, UpdateView, View)
 
 PAGIATE_OF_PAGES = 10
+COMMENTS_PER_PAGE = 20
 
 
-def posts_filter():
+# Столбцы, которые читают карточка публикации, её версия в кэше и
+# курсорная пагинация; остальные спискам не нужны.
+POST_CARD_FIELDS = (
+    'title', 'excerpt', 'pub_date', 'is_published', 'image', 'image_info',
+    'comment_count', 'author__username', 'location__name',
+    'location__is_published', 'category__title', 'category__slug',
+    'category__is_published',
+)
+
+
+def card_posts():
     return Post.objects.select_related(
-        'author', 'location', 'category',).filter(
-        pub_date__lte=timezone.now(),
-        is_published=True,
-        category__is_published=True,).annotate(
-        comment_count=Count('comments')).order_by('-pub_date')
+        'author', 'location', 'category',).only(*POST_CARD_FIELDS)
 
 
-class ActionPostMixin(LoginRequiredMixin):
-    def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect(
-                'blog:post_detail',
-                pk=self.kwargs['pk']
-            )
-        return super().dispatch(request, *args, **kwargs)
+def posts_filter():
+    return card_posts().filter(
+        is_visible=True,
+        category__is_published=True,).order_by('-pub_date')
+
+
+class OwnerRequiredMixin(LoginRequiredMixin):
+    """Пускает к изменению объекта только его автора.
+
+    Объект загружается один раз: `UpdateView` и `DeleteView` получают
+    тот же экземпляр, а автор сравнивается по `author_id`, без загрузки
+    пользователя.
+    """
+
+    owner_field = 'author_id'
+    # Аргумент URL с id публикации, на которую отправляется не автор.
+    post_url_kwarg = 'pk'
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_object'):
+            self._object = super().get_object(queryset)
+        return self._object
 
+    def get_denied_url(self):
+        """Куда перенаправить посетителя, который не автор объекта."""
+        return reverse(
+            'blog:post_detail',
+            kwargs={'pk': self.kwargs[self.post_url_kwarg]}
+        )
 
-class ActionCommentMixin(LoginRequiredMixin):
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect(
-                'blog:post_detail',
-                pk=self.kwargs['post_id']
-            )
+        if getattr(self.get_object(), self.owner_field) != request.user.pk:
+            return redirect(self.get_denied_url())
         return super().dispatch(request, *args, **kwargs)
 
 
+class ActionPostMixin(OwnerRequiredMixin):
+    post_url_kwarg = 'pk'
+
+
+class ActionCommentMixin(OwnerRequiredMixin):
+    post_url_kwarg = 'post_id'
+
+
 class RedirectionProfileMixin:
     def get_success_url(self):
         return reverse(
@@ -65,6 +107,119 @@ class RedirectionCommentPostMixin:
         )
 
 
+class CursorPaginationMixin:
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.BLOG_CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidPage as e:
+            raise Http404(str(e))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class PostCardCacheMixin:
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        set_card_versions(context['page_obj'])
+        context['card_cache_timeout'] = settings.BLOG_CARD_CACHE_TIMEOUT
+        return context
+
+
+class AnonymousPageCacheMixin:
+    """Кэширует страницу целиком для анонимных читателей.
+
+    Наследник перечисляет в `get_cache_tags` версии записей, показанных
+    на странице; запись в кэше действует, пока ни одна из них не
+    сменилась. Без тегов страница не кэшируется.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        response = get_cached_page(request)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'render'):
+            response.add_post_render_callback(self.store_page)
+        return response
+
+    def store_page(self, response):
+        tags = self.get_cache_tags(response.context_data)
+        if response.cookies or not tags:
+            return
+        set_cached_page(
+            self.request, response, tags, settings.BLOG_PAGE_CACHE_TIMEOUT)
+
+    def get_cache_tags(self, context):
+        """Версии записей, от которых зависит страница."""
+        return ()
+
+
+class ConditionalGetMixin:
+    """Отвечает `304 Not Modified`, не выбирая и не рендеря страницу,
+    если она не менялась с прошлого визита.
+
+    Наследник перечисляет в `get_etag_versions` версии, от которых
+    зависит страница; ETag собирается из них без запросов к базе.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag = page_etag(request, self.get_etag_versions())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            # Страница своя у каждого посетителя и проверяется при
+            # каждом просмотре.
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_etag_versions(self):
+        # Лента и категории: любые изменения постов, категорий,
+        # комментариев, авторов и местоположений.
+        return (feed_listing(), shared_records(), comments_activity())
+
+
+class ReplicaReadMixin:
+    """Читает данные страницы с реплики базы (см. `blog.routers`)."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(request):
+            response = super().dispatch(request, *args, **kwargs)
+            # Шаблон рендерится уже после dispatch, а его запросы тоже
+            # должны идти на реплику.
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
+
+
+class StickToPrimaryMixin:
+    """После изменения автор какое-то время читает с основной базы и
+    сразу видит свои правки.
+    """
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        stick_to_primary(response)
+        return response
+
+    def delete(self, request, *args, **kwargs):
+        response = super().delete(request, *args, **kwargs)
+        stick_to_primary(response)
+        return response
+
+
 class CommentBaseMixin(RedirectionCommentPostMixin):
     model = Comment
     template_name = 'blog/comment.html'
@@ -75,7 +230,14 @@ class CommentFormMixin(CommentBaseMixin):
     form_class = CommentForm
 
 
-class PostListView(ListView):
+class PostListView(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    PostCardCacheMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = PAGIATE_OF_PAGES
@@ -83,8 +245,12 @@ class PostListView(ListView):
     def get_queryset(self):
         return posts_filter()
 
+    def get_cache_tags(self, context):
+        return listing_tags(context['page_obj'], feed_listing())
+
 
 class PostCreateView(
+    StickToPrimaryMixin,
     LoginRequiredMixin,
     RedirectionProfileMixin,
     CreateView,
@@ -98,30 +264,77 @@ class PostCreateView(
         return super().form_valid(form)
 
 
-class PostDetailView(DetailView):
-    model = Post
-    template_name = 'blog/detail.html'
+class VisiblePostMixin:
+    """Скрывает от читателей неопубликованные и отложенные посты;
+    автору они доступны.
+    """
 
-    def get_object(self, queryset=None):
+    def get_visible_post(self, queryset=None):
         post = super().get_object(queryset)
-        if post.author != self.request.user and (
-            post.is_published is False
+        if post.author_id != self.request.user.pk and (
+            post.is_visible is False
             or post.category.is_published is False
-            or post.pub_date > timezone.now()
         ):
             raise Http404
         return post
 
+    def get_comments_page(self, post, cursor=None):
+        paginator = CursorPaginator(
+            post.comments.select_related('author'),
+            COMMENTS_PER_PAGE,
+            ('created_at', 'id'),
+        )
+        try:
+            return paginator.page(cursor)
+        except InvalidPage as e:
+            raise Http404(str(e))
+
+
+class PostDetailView(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    VisiblePostMixin,
+    DetailView,
+):
+    model = Post
+    template_name = 'blog/detail.html'
+
+    def get_etag_versions(self):
+        # Версия поста меняется и при изменении его комментариев.
+        return (version_name('post', self.kwargs['pk']), shared_records())
+
+    def get_object(self, queryset=None):
+        return self.get_visible_post(queryset)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related(
-            'author'
-        )
+        context['comments'] = self.get_comments_page(self.object)
+        return context
+
+    def get_cache_tags(self, context):
+        return post_page_tags(self.object, context['comments'])
+
+
+class PostCommentsView(VisiblePostMixin, DetailView):
+    """Следующая порция комментариев к посту HTML-фрагментом."""
+
+    model = Post
+    template_name = 'includes/comment_list.html'
+
+    def get_object(self, queryset=None):
+        return self.get_visible_post(queryset)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comments_page(
+            self.object, self.request.GET.get('cursor'))
         return context
 
 
 class PostUpdateView(
+    StickToPrimaryMixin,
     ActionPostMixin,
     RedirectionPostMixin,
     UpdateView,
@@ -132,6 +345,7 @@ class PostUpdateView(
 
 
 class PostDeleteView(
+    StickToPrimaryMixin,
     ActionPostMixin,
     RedirectionProfileMixin,
     DeleteView,
@@ -148,7 +362,7 @@ class PostDeleteView(
         return context
 
 
-class ProfileListView(ListView):
+class ProfileListView(ReplicaReadMixin, PostCardCacheMixin, ListView):
     template_name = 'blog/profile.html'
     paginate_by = PAGIATE_OF_PAGES
 
@@ -158,19 +372,10 @@ class ProfileListView(ListView):
             username=self.kwargs['username']
         )
         if self.request.user == self.author:
-            return Post.objects.select_related(
-            ).filter(
+            return card_posts().filter(
                 author=self.author
-            ).annotate(
-                comment_count=Count('comments')
             ).order_by('-pub_date')
-        return Post.objects.select_related(
-        ).filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-        ).annotate(
-            comment_count=Count('comments')
-        ).order_by('-pub_date')
+        return posts_filter().filter(author=self.author)
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
@@ -191,7 +396,13 @@ class ProfileEditUpdateView(
         return self.request.user
 
 
-class CategoryPostListlView(ListView):
+class CategoryPostListlView(
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    PostCardCacheMixin,
+    ListView,
+):
     model = Post
     template_name = 'blog/category.html'
     paginate_by = PAGIATE_OF_PAGES
@@ -210,8 +421,17 @@ class CategoryPostListlView(ListView):
         )
         return context
 
+    def get_cache_tags(self, context):
+        category = context['category']
+        return listing_tags(
+            context['page_obj'],
+            version_name('category', category.pk),
+            category_listing(category.pk),
+        )
+
 
 class CommentCreateView(
+    StickToPrimaryMixin,
     LoginRequiredMixin,
     CommentFormMixin,
     CreateView,
@@ -225,6 +445,7 @@ class CommentCreateView(
 
 
 class CommentUpdateView(
+    StickToPrimaryMixin,
     ActionCommentMixin,
     CommentFormMixin,
     UpdateView,
@@ -233,8 +454,54 @@ class CommentUpdateView(
 
 
 class CommentDeleteView(
+    StickToPrimaryMixin,
     ActionCommentMixin,
     CommentBaseMixin,
     DeleteView,
 ):
     pass
+
+
+class PostSearchView(PostCardCacheMixin, ListView):
+    """Поиск по заголовкам и текстам публикаций."""
+
+    template_name = 'blog/search.html'
+    paginate_by = PAGIATE_OF_PAGES
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        return SearchResults(self.query, posts_filter())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        # Поиск показывает не больше BLOG_SEARCH_WINDOW совпадений.
+        context['results_capped'] = (
+            context['paginator'].count >= settings.BLOG_SEARCH_WINDOW)
+        context['query_prefix'] = urlencode({'q': self.query}) + '&'
+        return context
+
+
+class ExportView(UserPassesTestMixin, View):
+    """Потоковая выгрузка для персонала: `?format=csv&since=<ISO 8601>`."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, kind):
+        if kind not in EXPORTS:
+            raise Http404
+        fmt = request.GET.get('format', 'jsonl')
+        if fmt not in FORMATS:
+            return HttpResponseBadRequest('Неизвестный формат')
+        since = request.GET.get('since')
+        try:
+            since = since and parse_since(since)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        response = StreamingHttpResponse(
+            Export(kind, fmt, since or None),
+            content_type=f'{FORMATS[fmt]}; charset=utf-8')
+        response['Content-Disposition'] = (
+            f'attachment; filename="{kind}.{fmt}"')
+        return response
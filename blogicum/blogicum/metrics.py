@@ -0,0 +1,245 @@
+"""Метрики запросов: число и время SQL, время рендеринга и всего запроса.
+
+`RequestMetricsMiddleware` считает их для маршрутов из
+`BLOG_METRICS_NAMESPACES`, отдаёт в заголовке `Server-Timing` и копит
+гистограммы по имени маршрута. `/metrics/` отдаёт гистограммы в
+текстовом формате Prometheus персоналу и по токену; они свои у каждого
+процесса.
+
+Запросы к базе учитывает обёртка `execute_wrapper`, которая ставится на
+каждое соединение при открытии, а текущий запрос находит через
+`ContextVar`. Поэтому учитываются и запросы из потоков пула
+асинхронных представлений, и запросы к репликам. Время рендеринга
+считает бэкенд шаблонов `DjangoTemplates` из этого модуля; запросы,
+выполненные из шаблона, входят и во время SQL, и во время рендеринга.
+"""
+import asyncio
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.template.backends.django import (
+    DjangoTemplates as BaseDjangoTemplates)
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+SECONDS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERIES_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'sql', 'render', 'rendering')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.render = 0.0
+        self.rendering = False
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql += perf_counter() - started
+        metrics.queries += 1
+
+
+def instrument(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    instrument(connection)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class ViewStats:
+    def __init__(self):
+        self.request = Histogram(SECONDS_BUCKETS)
+        self.sql = Histogram(SECONDS_BUCKETS)
+        self.render = Histogram(SECONDS_BUCKETS)
+        self.queries = Histogram(QUERIES_BUCKETS)
+
+
+class Registry:
+    """Гистограммы по именам маршрутов."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = defaultdict(ViewStats)
+
+    def observe(self, view_name, metrics, total):
+        with self.lock:
+            stats = self.views[view_name]
+            stats.request.observe(total)
+            stats.sql.observe(metrics.sql)
+            stats.render.observe(metrics.render)
+            stats.queries.observe(metrics.queries)
+
+    def clear(self):
+        with self.lock:
+            self.views.clear()
+
+    def exposition(self):
+        """Гистограммы в текстовом формате Prometheus."""
+        lines = []
+        with self.lock:
+            for metric, help_text in (
+                ('request_seconds', 'Время обработки запроса.'),
+                ('sql_seconds', 'Время запросов к базе.'),
+                ('render_seconds', 'Время рендеринга шаблонов.'),
+                ('queries', 'Число запросов к базе.'),
+            ):
+                name = f'blogicum_{metric}'
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for view_name, stats in sorted(self.views.items()):
+                    histogram = getattr(stats, metric.split('_')[0])
+                    lines.extend(histogram_lines(name, view_name, histogram))
+        return '\n'.join(lines) + '\n'
+
+
+def histogram_lines(name, view_name, histogram):
+    labels = f'view="{view_name}"'
+    cumulative = 0
+    for bound, count in zip(
+            (*histogram.bounds, '+Inf'), histogram.counts):
+        cumulative += count
+        yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+    yield f'{name}_sum{{{labels}}} {histogram.sum:.6f}'
+    yield f'{name}_count{{{labels}}} {cumulative}'
+
+
+registry = Registry()
+
+
+class RequestMetricsMiddleware:
+    """Считает метрики запросов к маршрутам `BLOG_METRICS_NAMESPACES`.
+
+    Ставится первым в `MIDDLEWARE`, чтобы время запроса включало
+    остальные middleware. Работает и в синхронной, и в асинхронной
+    цепочке, чтобы под ASGI асинхронные представления не уходили в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так же отмечает себя `MiddlewareMixin` в Django 3.2.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        # Соединения, открытые до загрузки middleware.
+        for connection in connections.all():
+            instrument(connection)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def finish(self, request, response, metrics, started):
+        total = perf_counter() - started
+        match = request.resolver_match
+        if match and match.namespace in settings.BLOG_METRICS_NAMESPACES:
+            registry.observe(match.view_name, metrics, total)
+            response['Server-Timing'] = (
+                f'db;desc="{metrics.queries} queries";'
+                f'dur={metrics.sql * 1000:.1f}, '
+                f'render;dur={metrics.render * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+        return response
+
+
+class DjangoTemplates(BaseDjangoTemplates):
+    """Бэкенд шаблонов Django, который учитывает время рендеринга."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        # Вложенный рендеринг уже учитывается внешним.
+        if metrics is None or metrics.rendering:
+            return self.template.render(context, request)
+        metrics.rendering = True
+        started = perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.render += perf_counter() - started
+            metrics.rendering = False
+
+
+def has_metrics_token(request):
+    token = settings.BLOG_METRICS_TOKEN
+    return bool(token) and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}')
+
+
+def metrics_view(request):
+    """Гистограммы для Prometheus.
+
+    Доступны персоналу и по токену `BLOG_METRICS_TOKEN`. Адрес клиента
+    не проверяется: за обратным прокси все запросы приходят с локального.
+    """
+    if not (request.user.is_staff or has_metrics_token(request)):
+        raise PermissionDenied
+    return HttpResponse(registry.exposition(),
+                        content_type='text/plain; version=0.0.4')
@@ -0,0 +1,180 @@
+"""Отдача статики и загруженных файлов без `django.conf.urls.static`.
+
+Файлы медиа поддерживают условные запросы (`ETag`, `Last-Modified`) и
+запросы диапазонов. Если перед Django стоит веб-сервер, саму передачу
+файла можно отдать ему (`X-Accel-Redirect` у nginx, `X-Sendfile` у
+Apache и lighttpd) настройкой `BLOG_MEDIA_ACCEL`.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotAllowed,
+    StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Хэш, который ManifestStaticFilesStorage добавляет к имени файла.
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.')
+# Сжатые копии статики в порядке предпочтения.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+CHUNK_SIZE = 64 * 1024
+
+
+def resolve(root, path):
+    try:
+        fullpath = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    return fullpath
+
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def check_method(request):
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(('GET', 'HEAD'))
+
+
+def parse_range(header, size):
+    """Возвращает `(начало, конец)` включительно для одного диапазона,
+    `None` — отдать файл целиком, `False` — диапазон недостижим.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or not any(match.groups()):
+        return None
+    start, end = match.groups()
+    if not start:
+        length = int(end)
+        if not length:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return False
+    return start, end
+
+
+def range_applies(request, etag, last_modified):
+    """`If-Range`: диапазон действует, только если файл не менялся."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    denied = check_method(request)
+    if denied:
+        return denied
+    fullpath = resolve(settings.MEDIA_ROOT, path)
+    stat = os.stat(fullpath)
+    etag, last_modified = file_etag(stat), int(stat.st_mtime)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': f'public, max-age={settings.BLOG_MEDIA_MAX_AGE}',
+    }
+    content_type = mimetypes.guess_type(fullpath)[0]
+    content_type = content_type or 'application/octet-stream'
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        response = not_modified
+    elif settings.BLOG_MEDIA_ACCEL:
+        # Файл, диапазоны и проверки повторит веб-сервер.
+        response = HttpResponse(content_type=content_type)
+        if settings.BLOG_MEDIA_ACCEL == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = quote(
+                settings.BLOG_MEDIA_ACCEL_PREFIX + path)
+        else:
+            response['X-Sendfile'] = fullpath
+    else:
+        response = file_response(request, fullpath, stat.st_size,
+                                 content_type, etag, last_modified)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def file_response(request, fullpath, size, content_type, etag,
+                  last_modified):
+    byte_range = None
+    if range_applies(request, etag, last_modified):
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is None:
+        response = FileResponse(open(fullpath, 'rb'),
+                                content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(fullpath, start, end - start + 1),
+            status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def serve_static(request, path):
+    """Статика из `STATIC_ROOT` со сжатыми копиями и кэшированием
+    хэшированных имён навсегда.
+    """
+    denied = check_method(request)
+    if denied:
+        return denied
+    fullpath = resolve(settings.STATIC_ROOT, path)
+    content_type = mimetypes.guess_type(fullpath)[0]
+    filename = os.path.basename(fullpath)
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encoding = None
+    for name, extension in ENCODINGS:
+        if name in accepted and os.path.isfile(fullpath + extension):
+            encoding, fullpath = name, fullpath + extension
+            break
+    stat = os.stat(fullpath)
+    etag, last_modified = file_etag(stat), int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(
+            open(fullpath, 'rb'), filename=filename,
+            content_type=content_type or 'application/octet-stream')
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if HASHED_NAME_RE.search(path):
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'public, max-age=3600'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
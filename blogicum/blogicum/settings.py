@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blogicum.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,10 +71,20 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Шаблоны Django с учётом времени рендеринга в метриках
+        'BACKEND': 'blogicum.metrics.DjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Шаблоны компилируются один раз на процесс, все шаблоны из
+            # TEMPLATES_DIR — при старте (blogicum.warmup); при изменении
+            # файла runserver сбрасывает кэш сам
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -91,13 +103,76 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # Бэкенд SQLite с профилем BLOG_SQLITE_PRAGMAS (blog/sqlite)
+        'ENGINE': 'blog.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Сколько секунд ждать, пока другой процесс держит блокировку
+        # записи, прежде чем ответить «database is locked»
+        'OPTIONS': {'timeout': 20},
+        # Соединение переиспользуется запросами потока, секунды
+        'CONN_MAX_AGE': int(os.getenv('BLOG_CONN_MAX_AGE', 60)),
     }
 }
 
+# Профиль SQLite, применяемый к каждому соединению (blog.sqlite).
+# journal_mode=wal сохраняется в файле базы; cache_size < 0 — в КиБ
+BLOG_SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+# Транзакции atomic() сразу берут блокировку записи (BEGIN IMMEDIATE)
+# и ждут её, а не падают с «database is locked» на первой записи
+BLOG_SQLITE_IMMEDIATE = True
+
+# Реплики только для чтения: пути к файлам SQLite через запятую. Ленту,
+# категории, профили и страницы публикаций читают с них
+# (blog.routers.ReplicaRouter); локально копию основной базы в реплики
+# переносит команда sync_replicas
+BLOG_DB_REPLICAS = []
+for number, name in enumerate(
+        filter(None, os.getenv('BLOG_DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    BLOG_DB_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Сколько секунд после изменения поста или комментария автор читает
+# с основной базы, пока реплики догоняют её
+BLOG_REPLICA_LAG = 10
+BLOG_PRIMARY_COOKIE = 'read_primary'
+
+MEDIA_URL = '/media/'
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Передача файлов медиа веб-серверу: None — отдаёт Django,
+# 'x-accel-redirect' — nginx (internal-локация BLOG_MEDIA_ACCEL_PREFIX),
+# 'x-sendfile' — Apache или lighttpd
+BLOG_MEDIA_ACCEL = os.getenv('BLOG_MEDIA_ACCEL') or None
+BLOG_MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Сколько браузер хранит файл медиа без проверки, секунды
+BLOG_MEDIA_MAX_AGE = 60 * 60 * 24
+
+# Общий для всех процессов кэш: версии, которые сбрасывают
+# `publish_scheduled` и воркеры, должны видеть и процессы сайта.
+# Каталог задаётся BLOG_CACHE_DIR; при нескольких серверах нужен
+# сетевой бэкенд (Redis, Memcached).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('BLOG_CACHE_DIR', BASE_DIR / 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -127,6 +202,43 @@ LOGIN_REDIRECT_URL = 'blog:index'
 # Задаем параметр Логин
 LOGIN_URL = 'login'
 
+# Пространства имён маршрутов, для которых считаются метрики запросов
+# (заголовок Server-Timing и гистограммы на /metrics/)
+BLOG_METRICS_NAMESPACES = ('blog', 'pages')
+
+# Токен, с которым /metrics/ доступен без входа персонала
+# (заголовок `Authorization: Bearer <токен>`); без токена — только персоналу
+BLOG_METRICS_TOKEN = os.getenv('BLOG_METRICS_TOKEN') or None
+
+# Курсорная пагинация ленты вместо постраничной: без COUNT(*) и OFFSET,
+# ссылки «вперёд/назад» вместо номеров страниц
+BLOG_CURSOR_PAGINATION = False
+
+# Время жизни закэшированной карточки публикации, секунды
+BLOG_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Время жизни страницы ленты, категории и публикации в кэше для
+# анонимных читателей, секунды
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Асинхронные обработчики ленты, категории и публикации (blog.async_views)
+# вместо классов-представлений; имеет смысл только под ASGI-сервером
+BLOG_ASYNC_VIEWS = os.getenv('BLOG_ASYNC_VIEWS') == '1'
+
+# Бэкенд поиска по публикациям (путь к классу); None — FTS5 для SQLite,
+# LIKE для остальных баз
+BLOG_SEARCH_BACKEND = None
+
+# Сколько самых новых совпадений ранжируется и показывается в поиске
+BLOG_SEARCH_WINDOW = 10000
+
+# Ширины уменьшенных копий фото публикаций, пиксели
+BLOG_IMAGE_WIDTHS = (320, 640, 960, 1280)
+
+# Фоновых потоков обработки фото; 0 — обрабатывать сразу после
+# сохранения поста
+BLOG_IMAGE_WORKERS = 2
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -149,6 +261,17 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [BASE_DIR / 'static_dev', ]
 
+# Сюда collectstatic собирает статику для продакшена
+STATIC_ROOT = BASE_DIR / 'static'
+
+# Продакшен-режим статики: хэшированные имена и сжатые копии файлов
+# (нужен collectstatic), отдача из STATIC_ROOT с долгим кэшированием
+BLOG_PRODUCTION_STATIC = os.getenv('BLOG_PRODUCTION_STATIC') == '1'
+
+if BLOG_PRODUCTION_STATIC:
+    STATICFILES_STORAGE = (
+        'blogicum.storage.CompressedManifestStaticFilesStorage')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
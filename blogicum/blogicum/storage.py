@@ -0,0 +1,55 @@
+"""Хранилище статики для продакшена.
+
+К именам файлов добавляется хэш содержимого (`ManifestStaticFilesStorage`),
+поэтому их можно кэшировать навсегда. Рядом с текстовыми файлами
+`collectstatic` кладёт сжатые копии `.gz` и, если установлен пакет
+`brotli`, `.br`: сервер отдаёт их без сжатия на каждый запрос.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSED_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.json', '.xml', '.html', '.ico',
+)
+# Файлы меньше этого размера сжимать невыгодно.
+MIN_COMPRESS_SIZE = 256
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = super().post_process(paths, dry_run, **options)
+        for name, hashed_name, result in processed:
+            yield name, hashed_name, result
+            if dry_run or isinstance(result, Exception):
+                continue
+            for target in {name, hashed_name} - {None}:
+                self.compress(target)
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSED_EXTENSIONS):
+            return
+        with self.open(name) as file:
+            data = file.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for extension, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + extension):
+                self.delete(name + extension)
+            self._save(name + extension, ContentFile(compressed))
@@ -13,11 +13,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include, reverse_lazy
+from django.urls import path, include, re_path, reverse_lazy
 from django.contrib.auth.forms import UserCreationForm
 from django.views.generic.edit import CreateView
 
+from . import metrics, serving
+
 urlpatterns = [
     path('pages/', include('pages.urls')),
     path('admin/', admin.site.urls),
@@ -31,9 +34,18 @@ urlpatterns = [
         ),
         name='registration',
     ),
+    path('metrics/', metrics.metrics_view, name='metrics'),
     path('', include('blog.urls')),
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'),
+            serving.serve_media),
 ]
 
+if settings.BLOG_PRODUCTION_STATIC:
+    urlpatterns.append(
+        re_path(r'^%s(?P<path>.+)$' % settings.STATIC_URL.lstrip('/'),
+                serving.serve_static),
+    )
+
 """if settings.DEBUG:
     import debug_toolbar
     # Добавить к списку urlpatterns список адресов из приложения debug_toolbar:
@@ -0,0 +1,31 @@
+"""Прогрев кэша шаблонов при старте процесса.
+
+Кэширующий загрузчик компилирует шаблон при первом обращении, и первые
+запросы каждого процесса читали бы и разбирали файлы. `wsgi.py` и
+`asgi.py` вызывают `warm_up_templates()` до приёма запросов, так что
+`base.html`, `includes/` и остальные шаблоны из `DIRS` уже скомпилированы.
+"""
+import os
+
+from django.template import engines
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(TEMPLATE_EXTENSIONS):
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, directory).replace(os.sep, '/')
+
+
+def warm_up_templates():
+    """Компилирует все шаблоны из `DIRS`; возвращает их число."""
+    compiled = 0
+    for backend in engines.all():
+        for directory in backend.dirs:
+            for name in template_names(directory):
+                backend.get_template(name)
+                compiled += 1
+    return compiled
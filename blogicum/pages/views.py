@@ -14,7 +14,7 @@ def page_not_found(request, exception):
     return render(request, 'pages/404.html', status=404)
 
 
-def csrf_failure(request, reason=''):
+def csrf_failure(request, reason='', exception=None):
     return render(request, 'pages/403csrf.html', status=403)
 
 
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,19 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def process_images_inline(settings, tmp_path):
+    # Фоновые обработчики фото писали бы в настоящий MEDIA_ROOT и
+    # обновляли бы базу параллельно с тестом.
+    settings.BLOG_IMAGE_WORKERS = 0
+    settings.MEDIA_ROOT = tmp_path / "media"
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
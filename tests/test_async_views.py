@@ -0,0 +1,63 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory
+
+from blog import async_views, views
+
+# Асинхронные обработчики ходят в базу из потоков пула со своими
+# соединениями: данные теста должны быть зафиксированы.
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def get(view, url, user=None, **kwargs):
+    request = RequestFactory(SERVER_NAME="localhost").get(url)
+    request.user = user or AnonymousUser()
+    if hasattr(view, "view_class"):
+        return view(request, **kwargs)
+    return async_to_sync(view)(request, **kwargs)
+
+
+@pytest.mark.parametrize("async_view,view_class,url,kwargs", [
+    ("post_list", views.PostListView, lambda post: "/", lambda post: {}),
+    ("category_posts", views.CategoryPostListlView,
+     lambda post: f"/category/{post.category.slug}/",
+     lambda post: {"category_slug": post.category.slug}),
+    ("post_detail", views.PostDetailView,
+     lambda post: f"/posts/{post.id}/", lambda post: {"pk": post.id}),
+])
+def test_async_views_render_same_page(
+        async_view, view_class, url, kwargs, mixer,
+        post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    sync_response = get(view_class.as_view(), url(post), **kwargs(post))
+    sync_response.render()
+    cache.clear()
+    async_response = get(
+        getattr(async_views, async_view), url(post), **kwargs(post))
+    assert async_response.status_code == 200
+    assert async_response.content == sync_response.content, (
+        f"Убедитесь, что асинхронный обработчик `{async_view}` выводит"
+        " ту же страницу, что и синхронный."
+    )
+
+
+def test_async_post_detail_hides_unpublished_post(
+        mixer, user, another_user, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    with pytest.raises(Http404):
+        get(async_views.post_detail, f"/posts/{post.id}/",
+            user=another_user, pk=post.id)
+    response = get(async_views.post_detail, f"/posts/{post.id}/",
+                   user=post.author, pk=post.id)
+    assert response.status_code == 200
+
+
+def test_async_post_list_invalid_page_is_404(post_with_published_location):
+    with pytest.raises(Http404):
+        get(async_views.post_list, "/?page=100")
@@ -0,0 +1,84 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.search import get_backend
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_bulkload_fixture(tmp_path, user, published_category):
+    created = timezone.now() - timedelta(days=30)
+    rows = [
+        {
+            "model": "blog.post",
+            "pk": 1000 + number,
+            "fields": {
+                "title": f"Озеро {number}",
+                "text": "Заметки с берега",
+                "author": user.pk,
+                "category": published_category.pk,
+                "is_published": True,
+                "pub_date": (
+                    timezone.now() + timedelta(days=number - 1)).isoformat(),
+                "created_at": created.isoformat(),
+            },
+        }
+        for number in range(3)
+    ]
+    rows.append({
+        "model": "blog.comment",
+        "pk": 1000,
+        "fields": {
+            "text": "Красиво",
+            "post": 1000,
+            "author": user.pk,
+            "created_at": created.isoformat(),
+        },
+    })
+    fixture = tmp_path / "posts.jsonl"
+    fixture.write_text(
+        "\n".join(json.dumps(row, ensure_ascii=False) for row in rows),
+        encoding="utf-8",
+    )
+    call_command("bulkload", str(fixture), "--batch-size", "2",
+                 "--commit-every", "3", stdout=StringIO())
+
+    posts = Post.objects.in_bulk([1000, 1001, 1002])
+    assert len(posts) == 3 and Comment.objects.filter(pk=1000).exists(), (
+        "Убедитесь, что `bulkload` загружает все строки фикстуры."
+    )
+    assert posts[1000].created_at == created, (
+        "Убедитесь, что `bulkload` сохраняет `created_at` из фикстуры."
+    )
+    assert [posts[pk].is_visible for pk in (1000, 1001, 1002)] == [
+        True, True, False], (
+        "Убедитесь, что `bulkload` вычисляет `is_visible` постов."
+    )
+    assert posts[1000].comment_count == 1
+    assert get_backend().count("озеро") == 2, (
+        "Убедитесь, что после `bulkload` поисковый индекс перестроен."
+    )
+
+
+def test_bulkload_synthetic():
+    call_command(
+        "bulkload", "--synthetic", "--users", "3", "--categories", "2",
+        "--locations", "2", "--posts", "50", "--comments", "120",
+        "--batch-size", "16", stdout=StringIO(),
+    )
+    assert Post.objects.count() == 50
+    assert Comment.objects.count() <= 120
+    mismatched = [
+        post for post in Post.objects.all()
+        if post.comment_count != post.comments.count()
+    ]
+    assert not mismatched, (
+        "Убедитесь, что `comment_count` сгенерированных постов совпадает"
+        " с числом комментариев."
+    )
@@ -0,0 +1,52 @@
+import pytest
+from django.test import Client
+
+from blog.cache import set_card_versions
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_cache_invalidation(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    assert post.title in user_client.get("/").content.decode("utf-8")
+
+    post.title = "Заголовок после редактирования"
+    post.save()
+    content = user_client.get("/").content.decode("utf-8")
+    assert post.title in content, (
+        "Убедитесь, что карточка публикации обновляется после её изменения."
+    )
+
+    post.location.name = "Новое название места"
+    post.location.save()
+    content = user_client.get("/").content.decode("utf-8")
+    assert post.location.name in content, (
+        "Убедитесь, что карточка публикации обновляется после изменения"
+        " её местоположения."
+    )
+
+    post.category.title = "Новое название категории"
+    post.category.save()
+    content = user_client.get("/").content.decode("utf-8")
+    assert post.category.title in content, (
+        "Убедитесь, что карточка публикации обновляется после изменения"
+        " её категории."
+    )
+
+
+def test_login_keeps_cached_cards(
+        client, user, post_with_published_location):
+    [post] = set_card_versions([Post.objects.get()])
+    Client().force_login(user)
+    [same_post] = set_card_versions([Post.objects.get()])
+    assert same_post.card_version == post.card_version, (
+        "Убедитесь, что вход автора не сбрасывает кэш его карточек."
+    )
+
+    user.username = "renamed"
+    user.save()
+    assert "@renamed" in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что карточка обновляется после смены имени автора."
+    )
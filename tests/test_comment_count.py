@@ -0,0 +1,50 @@
+import pytest
+from django.db import OperationalError
+from django.db.models import QuerySet
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_orm_writes(
+        mixer, user, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend("blog.Comment", post=post, author=user)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что `comment_count` растёт при создании комментария"
+        " не только через форму на сайте, но и из админки или shell."
+    )
+
+    comments[0].text = "Изменённый текст"
+    comments[0].save()
+    comments[1].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что `comment_count` уменьшается при удалении"
+        " комментария и не меняется при его редактировании."
+    )
+
+
+
+# Без транзакции теста, как при autocommit на сайте.
+@pytest.mark.django_db(transaction=True)
+def test_comment_is_not_saved_without_count(
+        mixer, user, post_with_published_location, monkeypatch):
+    post = post_with_published_location
+
+    def locked(self, **kwargs):
+        raise OperationalError("database table is locked: blog_post")
+
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    monkeypatch.setattr(QuerySet, "update", locked)
+    with pytest.raises(OperationalError):
+        mixer.blend("blog.Comment", post=post, author=user)
+    with pytest.raises(OperationalError):
+        comment.delete()
+    monkeypatch.undo()
+    assert list(Comment.objects.filter(post=post)) == [comment], (
+        "Убедитесь, что комментарий и `comment_count` записываются"
+        " в одной транзакции."
+    )
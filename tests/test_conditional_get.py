@@ -0,0 +1,84 @@
+import pytest
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def urls(post_with_published_location):
+    post = post_with_published_location
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/posts/{post.id}/",
+    )
+
+
+def test_unchanged_pages_answer_not_modified(
+        client, urls, django_assert_num_queries):
+    for url in urls:
+        etag = client.get(url)["ETag"]
+        with django_assert_num_queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отдаётся"
+            " ответом 304 без запросов к базе."
+        )
+        assert response.content == b""
+
+
+def test_not_modified_skips_rendering_for_users(
+        user_client, urls, django_assert_max_num_queries):
+    for url in urls:
+        # Первый ответ выдаёт CSRF-cookie, которая входит в ETag.
+        user_client.get(url)
+        etag = user_client.get(url)["ETag"]
+        # Остаются только запросы сессии и пользователя.
+        with django_assert_max_num_queries(2):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+
+def test_etag_changes_with_content(
+        client, user_client, mixer, urls, post_with_published_location):
+    post = post_with_published_location
+    etags = {url: client.get(url)["ETag"] for url in urls}
+    assert all(
+        user_client.get(url)["ETag"] != etag for url, etag in etags.items()
+    ), "Убедитесь, что ETag страницы у разных посетителей разный."
+
+    mixer.blend("blog.Comment", post=post)
+    for url, etag in etags.items():
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f"Убедитесь, что после нового комментария страница `{url}`"
+            " отдаётся заново."
+        )
+        etags[url] = response["ETag"]
+
+    post.category.is_published = False
+    post.category.save()
+    assert client.get(
+        urls[2], HTTP_IF_NONE_MATCH=etags[urls[2]]).status_code == 404
+
+
+def test_login_keeps_etag(client, user, urls):
+    etags = {url: client.get(url)["ETag"] for url in urls}
+    Client().force_login(user)
+    for url, etag in etags.items():
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304, (
+            f"Убедитесь, что вход автора в систему не сбрасывает ETag"
+            f" страницы `{url}`."
+        )
+
+    user.email = "new@example.com"
+    user.save()
+    for url, etag in etags.items():
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    user.username = "renamed"
+    user.save()
+    for url, etag in etags.items():
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            f"Убедитесь, что после смены имени автора страница `{url}`"
+            " отдаётся заново."
+        )
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    pub_dates = (
+        timezone.now() - timedelta(minutes=minutes)
+        for minutes in range(1, N_PER_PAGE * 3)
+    )
+    return mixer.cycle(N_PER_PAGE * 2 + 5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=pub_dates,
+    )
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_cursor_walk_forward_and_back(user_client, feed_posts):
+    expected = sorted(
+        feed_posts, key=lambda post: (post.pub_date, post.id), reverse=True)
+
+    pages = []
+    response = user_client.get("/")
+    while True:
+        page = response.context["page_obj"]
+        pages.append([post.id for post in page])
+        if not page.has_next():
+            break
+        response = user_client.get(f"/?cursor={page.next_cursor}")
+
+    assert [post_id for page in pages for post_id in page] == [
+        post.id for post in expected
+    ], (
+        "Убедитесь, что при курсорной пагинации лента обходится целиком,"
+        " без пропусков и повторов, «от новых к старым»."
+    )
+    assert all(len(page) == N_PER_PAGE for page in pages[:-1])
+
+    page = response.context["page_obj"]
+    response = user_client.get(f"/?cursor={page.previous_cursor}")
+    assert [post.id for post in response.context["page_obj"]] == pages[-2], (
+        "Убедитесь, что курсор «назад» возвращает предыдущую страницу."
+    )
+
+
+@override_settings(BLOG_CURSOR_PAGINATION=True)
+def test_invalid_cursor_is_404(user_client, feed_posts):
+    response = user_client.get("/?cursor=not-a-cursor")
+    assert response.status_code == 404
+
+
+def test_post_comments_are_paginated(
+        user_client, mixer, post_with_published_location):
+    from blog.views import COMMENTS_PER_PAGE
+
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PER_PAGE + 5).blend(
+        "blog.Comment", post=post)
+
+    response = user_client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert [c.id for c in page] == [c.id for c in comments][
+        :COMMENTS_PER_PAGE
+    ], (
+        "Убедитесь, что на странице публикации выводится первая порция"
+        " комментариев, «от старых к новым»."
+    )
+    assert page.has_next()
+
+    response = user_client.get(
+        f"/posts/{post.id}/comments/?cursor={page.next_cursor}")
+    assert response.status_code == 200
+    rest = response.context["comments"]
+    assert [c.id for c in rest] == [c.id for c in comments][
+        COMMENTS_PER_PAGE:
+    ]
+    assert not rest.has_next()
+    assert "<html" not in response.content.decode("utf-8"), (
+        "Убедитесь, что следующая порция комментариев отдаётся фрагментом"
+        " HTML без обёртки страницы."
+    )
@@ -0,0 +1,44 @@
+import pytest
+from django.core import serializers
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = "Первое  слово\nи ещё <b>девять</b> слов, а потом " + "текст " * 50
+
+
+def test_excerpt_matches_truncatewords(post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save(update_fields=["text"])
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT, 10), (
+        "Убедитесь, что `excerpt` пересчитывается при сохранении текста."
+    )
+
+    Post.objects.filter(pk=post.pk).update(excerpt="")
+    raw = serializers.serialize("python", [post])
+    for deserialized in serializers.deserialize("python", raw):
+        deserialized.save()
+    post.refresh_from_db()
+    assert post.excerpt == truncatewords(LONG_TEXT, 10), (
+        "Убедитесь, что `excerpt` заполняется и при `loaddata`."
+    )
+
+
+def test_post_list_does_not_load_text(
+        many_posts_with_published_locations, client, settings):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    settings.BLOG_CARD_CACHE_TIMEOUT = 0
+    post = Post.objects.order_by("-pub_date").first()
+    with CaptureQueriesContext(connection) as queries:
+        content = client.get("/").content.decode()
+    loaded_text = ['"blog_post"."text"' in query["sql"] for query in queries]
+    assert not any(loaded_text), (
+        "Убедитесь, что лента не загружает полный текст публикаций."
+    )
+    assert post.excerpt and post.excerpt in content
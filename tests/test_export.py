@@ -0,0 +1,77 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category)
+    for days, post in zip((3, 2, 1), posts):
+        post.created_at = timezone.now() - timedelta(days=days)
+        post.save()
+    return posts
+
+
+def export_command(*args):
+    stdout, stderr = StringIO(), StringIO()
+    call_command("export", *args, stdout=stdout, stderr=stderr)
+    return stdout.getvalue(), stderr.getvalue()
+
+
+def test_export_command_since_watermark(posts):
+    output, report = export_command("posts")
+    rows = [json.loads(line) for line in output.splitlines()]
+    assert [row["id"] for row in rows] == [post.id for post in posts], (
+        "Убедитесь, что `export` выгружает все посты в JSON Lines."
+    )
+    assert rows[0]["title"] == posts[0].title
+    watermark = report.rsplit("метка: ", 1)[1].strip()
+    assert watermark == posts[-1].created_at.isoformat(), (
+        "Убедитесь, что `export` сообщает метку для следующей выгрузки."
+    )
+
+    since = posts[0].created_at.isoformat()
+    output, _ = export_command("posts", "--since", since)
+    assert [json.loads(line)["id"] for line in output.splitlines()] == [
+        post.id for post in posts[1:]], (
+        "Убедитесь, что с `--since` выгружаются только посты,"
+        " добавленные позже метки."
+    )
+    output, _ = export_command("posts", "--since", watermark)
+    assert output == ""
+
+
+def test_export_endpoint_staff_only(
+        posts, client, user_client, django_user_model):
+    url = "/export/posts/"
+    assert client.get(url).status_code == 302
+    assert user_client.get(url).status_code == 403, (
+        "Убедитесь, что выгрузка доступна только персоналу."
+    )
+
+    staff = django_user_model.objects.create(
+        username="staff", is_staff=True)
+    client.force_login(staff)
+    response = client.get(url, {"format": "csv"})
+    assert response.status_code == 200
+    assert response.streaming, (
+        "Убедитесь, что выгрузка отдаётся `StreamingHttpResponse`."
+    )
+    content = b"".join(response.streaming_content).decode()
+    rows = list(csv.DictReader(StringIO(content)))
+    assert [int(row["id"]) for row in rows] == [post.id for post in posts]
+
+    since = posts[1].created_at.isoformat()
+    response = client.get(url, {"since": since})
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [posts[2].id]
+    assert client.get(url, {"since": "вчера"}).status_code == 400
+    assert client.get("/export/users/").status_code == 404
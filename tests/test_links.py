@@ -0,0 +1,64 @@
+import pytest
+from django.urls import NoReverseMatch, reverse, set_script_prefix
+from django.urls.resolvers import URLResolver
+
+from blog.links import link
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("view_name, args", [
+    ("blog:post_detail", [7]),
+    ("blog:profile", ["some-user_1"]),
+    ("blog:category_posts", ["travel"]),
+    ("blog:edit_comment", [3, 12]),
+    ("blog:delete_comment", ["пост", 12]),
+    ("blog:export", ["posts"]),
+])
+def test_link_matches_reverse(view_name, args):
+    assert link(view_name, *args) == reverse(view_name, args=args), (
+        "Убедитесь, что `link()` строит ту же ссылку, что и `reverse()`."
+    )
+
+
+@pytest.mark.parametrize("view_name, args", [
+    ("blog:post_detail", ["abc"]),
+    ("blog:profile", ["user.name"]),
+    ("blog:edit_comment", ["a/b", 1]),
+])
+def test_link_rejects_invalid_args(view_name, args):
+    with pytest.raises(NoReverseMatch):
+        reverse(view_name, args=args)
+    with pytest.raises(NoReverseMatch):
+        link(view_name, *args)
+
+
+def test_link_uses_script_prefix():
+    link("blog:post_detail", 1)
+    set_script_prefix("/blog/")
+    try:
+        assert link("blog:post_detail", 1) == "/blog/posts/1/"
+    finally:
+        set_script_prefix("/")
+
+
+def test_post_list_does_not_reverse_per_post(
+        many_posts_with_published_locations, client, settings, monkeypatch):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    settings.BLOG_CARD_CACHE_TIMEOUT = 0
+    calls = []
+    original = URLResolver._reverse_with_prefix
+
+    def spy(self, *args, **kwargs):
+        calls.append(args[0])
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(URLResolver, "_reverse_with_prefix", spy)
+    client.get("/")
+    first_page = len(calls)
+    assert not {"post_detail", "profile", "category_posts"} & set(calls), (
+        "Убедитесь, что карточки публикаций не вызывают `reverse()`."
+    )
+    calls.clear()
+    client.get("/")
+    assert len(calls) == first_page
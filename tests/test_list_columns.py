@@ -0,0 +1,81 @@
+"""Списки публикаций загружают только столбцы, нужные карточкам.
+
+Если шаблон обратится к отложенному полю, Django догрузит его
+отдельным запросом на каждую карточку; тесты на это падают.
+"""
+import pytest
+from django.db import connection
+from django.db.models import Model
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+PRUNED_COLUMNS = (
+    '"blog_post"."text"',
+    '"auth_user"."password"',
+    '"auth_user"."email"',
+    '"blog_category"."description"',
+)
+
+
+@pytest.fixture(autouse=True)
+def no_caches(settings):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    settings.BLOG_CARD_CACHE_TIMEOUT = 0
+
+
+@pytest.fixture
+def refetches(monkeypatch):
+    calls = []
+    refresh_from_db = Model.refresh_from_db
+
+    def spy(self, using=None, fields=None):
+        calls.append((type(self).__name__, fields))
+        return refresh_from_db(self, using, fields)
+
+    monkeypatch.setattr(Model, "refresh_from_db", spy)
+    return calls
+
+
+@pytest.fixture
+def listed_posts(
+        mixer, user, post_with_published_location, published_category):
+    return [
+        post_with_published_location,
+        *mixer.cycle(3).blend(
+            "blog.Post", author=user, category=published_category,
+            title="Камчатка"),
+        mixer.blend("blog.Post", author=user, category=published_category,
+                    is_published=False),
+    ]
+
+
+@pytest.mark.parametrize("cursor_pagination", [False, True])
+def test_post_lists_do_not_refetch_deferred_fields(
+        cursor_pagination, settings, listed_posts, user, client,
+        user_client, refetches):
+    settings.BLOG_CURSOR_PAGINATION = cursor_pagination
+    category = listed_posts[0].category
+    for page_client, url in (
+        (client, "/"),
+        (client, f"/category/{category.slug}/"),
+        (client, f"/profile/{user.username}/"),
+        (user_client, f"/profile/{user.username}/"),
+        (client, "/search/?q=Камчатка"),
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            response = page_client.get(url)
+        assert response.status_code == 200
+        assert len(response.context["page_obj"]) > 0
+        assert not refetches, (
+            f"Убедитесь, что шаблон страницы `{url}` не читает полей,"
+            " которые не загружает запрос списка: догружено"
+            f" {refetches}."
+        )
+        post_queries = [query["sql"] for query in queries
+                        if 'FROM "blog_post"' in query["sql"]]
+        assert post_queries
+        for column in PRUNED_COLUMNS:
+            assert not any(column in sql for sql in post_queries), (
+                f"Убедитесь, что страница `{url}` не загружает {column}."
+            )
@@ -0,0 +1,83 @@
+import logging
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+
+from blogicum.metrics import registry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    registry.clear()
+
+
+def server_timing(response):
+    return dict(
+        re.findall(r'(\w+);(?:desc="[^"]*";)?dur=([\d.]+)',
+                   response["Server-Timing"]))
+
+
+def test_server_timing_header(client, user_client):
+    response = client.get("/")
+    assert "Server-Timing" in response, (
+        "Убедитесь, что страницы блога отдают заголовок `Server-Timing`."
+    )
+    timing = server_timing(response)
+    assert set(timing) == {"db", "render", "total"}
+    assert float(timing["render"]) > 0
+    assert float(timing["total"]) >= float(timing["render"])
+    queries = int(re.search(r'"(\d+) queries"',
+                            response["Server-Timing"]).group(1))
+    assert queries > 0, (
+        "Убедитесь, что `Server-Timing` сообщает число запросов к базе."
+    )
+
+    assert "Server-Timing" in client.get("/pages/about/")
+    assert "Server-Timing" not in user_client.get("/admin/")
+
+
+def test_metrics_endpoint(client, settings):
+    settings.BLOG_METRICS_TOKEN = "secret"
+    client.get("/")
+    client.get("/")
+    client.get("/pages/rules/")
+    text = client.get(
+        "/metrics/", HTTP_AUTHORIZATION="Bearer secret").content.decode()
+    assert 'blogicum_request_seconds_count{view="blog:index"} 2' in text, (
+        "Убедитесь, что `/metrics/` копит гистограммы по имени маршрута."
+    )
+    assert 'blogicum_queries_bucket{view="pages:rules",le="0"} 1' in text
+
+    for headers in ({}, {"HTTP_AUTHORIZATION": "Bearer wrong"}):
+        response = client.get("/metrics/", REMOTE_ADDR="127.0.0.1", **headers)
+        assert response.status_code == 403, (
+            "Убедитесь, что метрики недоступны без токена и входа персонала,"
+            " в том числе с локального адреса."
+        )
+
+
+def test_metrics_without_token(client, settings, mixer):
+    settings.BLOG_METRICS_TOKEN = None
+    response = client.get("/metrics/", HTTP_AUTHORIZATION="Bearer None")
+    assert response.status_code == 403
+    client.force_login(mixer.blend("auth.User", is_staff=True))
+    assert client.get("/metrics/").status_code == 200
+
+
+def test_middleware_chain_stays_async(caplog, settings):
+    settings.DEBUG = True
+    with caplog.at_level(logging.DEBUG, logger="django.request"):
+        ASGIHandler()
+    assert not [r for r in caplog.records if "adapted" in r.getMessage()], (
+        "Убедитесь, что middleware метрик не переводит асинхронную"
+        " цепочку обработки запроса в поток."
+    )
+
+
+def test_server_timing_under_async_client(async_client):
+    response = async_to_sync(async_client.get)("/pages/about/")
+    assert set(server_timing(response)) == {"db", "render", "total"}
@@ -0,0 +1,74 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.views.generic import TemplateView
+
+from blog.cache import get_cached_page
+from blog.views import AnonymousPageCacheMixin
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_pages_are_cached(
+        client, django_assert_num_queries, post_with_published_location):
+    post = post_with_published_location
+    for url in (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/posts/{post.id}/",
+    ):
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content, (
+            f"Убедитесь, что страница `{url}` для анонимного читателя"
+            " отдаётся из кэша."
+        )
+
+
+def test_page_cache_invalidation(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    detail_url = f"/posts/{post.id}/"
+    client.get("/")
+    client.get(detail_url)
+
+    post.title = "Заголовок после редактирования"
+    post.save()
+    assert post.title in client.get("/").content.decode("utf-8"), (
+        "Убедитесь, что после изменения публикации лента обновляется."
+    )
+
+    comment = mixer.blend(
+        "blog.Comment", post=post, text="Новый комментарий")
+    assert comment.text in client.get(detail_url).content.decode("utf-8"), (
+        "Убедитесь, что после добавления комментария страница публикации"
+        " обновляется."
+    )
+
+    post.category.is_published = False
+    post.category.save()
+    assert client.get(detail_url).status_code == 404
+    assert client.get(f"/category/{post.category.slug}/").status_code == 404
+
+
+def test_authenticated_pages_are_not_cached(
+        user_client, django_assert_max_num_queries,
+        post_with_published_location):
+    user_client.get("/")
+    with django_assert_max_num_queries(10) as queries:
+        user_client.get("/")
+    assert len(queries) > 0
+
+
+def test_page_without_tags_is_not_cached(rf):
+    class UntaggedView(AnonymousPageCacheMixin, TemplateView):
+        template_name = "pages/about.html"
+
+    request = rf.get("/untagged/")
+    request.user = AnonymousUser()
+    response = UntaggedView.as_view()(request)
+    response.render()
+    assert response.status_code == 200
+    assert get_cached_page(request) is None, (
+        "Убедитесь, что страница без тегов версий не попадает в кэш."
+    )
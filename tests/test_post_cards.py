@@ -0,0 +1,114 @@
+import pytest
+from django.core.cache import caches
+from django.template import Context, engines
+
+pytestmark = [pytest.mark.django_db]
+
+# Карточка до перехода на {% post_cards %}: вложенные {% include %},
+# {% url %} и {% cache %} на каждую публикацию. Перевод строки после
+# {% load %} в карточки из кэша не входит.
+LEGACY_CARD = """{% load cache %}{% cache card_cache_timeout post_card post.id post.card_version %}
+<div class="col d-flex justify-content-center">
+  <div class="card" style="width: 40rem;">
+    <div class="card-body">
+      {% if post.image %}
+        {% include "includes/post_image.html" with sizes="(max-width: 640px) 100vw, 640px" lazy=True %}
+      {% endif %}
+      <h5 class="card-title">{{ post.title }}</h5>
+      <h6 class="card-subtitle mb-2 text-muted">
+        <small>
+          {% if not post.is_published %}
+            <p class="text-danger">Пост снят с публикации админом</p>
+          {% elif not post.category.is_published %}
+            <p class="text-danger">Выбранная категория снята с публикации админом</p>
+          {% endif %}
+          {{ post.pub_date|date:"d E Y, H:i" }} | {% if post.location and post.location.is_published %}{{ post.location.name }}{% else %}Планета Земля{% endif %}<br>
+          От автора <a class="text-muted" href="{% url 'blog:profile' post.author.username %}">@{{ post.author.username }}</a> в
+          категории {% include "includes/category_link.html" %}
+        </small>
+      </h6>
+      <p class="card-text">{{ post.text|truncatewords:10 }}</p>
+      <a href="{% url 'blog:post_detail' post.id %}" class="card-link">Читать полный текст</a>
+      <a href="{% url 'blog:post_detail' post.id %}" class="card-link text-muted">Комментарии ({{ post.comment_count }})</a>
+    </div>
+  </div>
+</div>
+{% endcache %}"""
+
+
+def render(source, **context):
+    engine = engines["django"].engine
+    return engine.from_string(source).render(Context(context))
+
+
+def test_post_cards_match_legacy_include(
+        post_with_published_location, mixer, user, published_category):
+    posts = [
+        post_with_published_location,
+        *mixer.cycle(3).blend(
+            "blog.Post", author=user, category=published_category),
+    ]
+    expected = render(
+        "{% for post in posts %}{% include card %}|{% endfor %}",
+        posts=posts, card=engines["django"].engine.from_string(LEGACY_CARD),
+        card_cache_timeout=0,
+    )
+    actual = render(
+        "{% load blog_tags %}{% post_cards posts as cards %}"
+        "{% for card in cards %}{{ card }}|{% endfor %}",
+        posts=posts, card_cache_timeout=0,
+    )
+    assert actual == expected, (
+        "Убедитесь, что `post_cards` выводит ту же разметку карточек,"
+        " что и вложенный `{% include %}` карточки."
+    )
+
+
+def test_post_cards_read_cache_once(
+        client, mixer, user, published_category, monkeypatch):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category)
+    client.get("/")
+
+    calls = []
+    get_many = type(caches["default"]).get_many
+
+    def spy(self, keys, *args, **kwargs):
+        keys = list(keys)
+        calls.append(keys)
+        return get_many(self, keys, *args, **kwargs)
+
+    monkeypatch.setattr(type(caches["default"]), "get_many", spy)
+    type(posts[0]).objects.filter(pk=posts[0].pk).update(title="Без сигнала")
+    content = client.get("/?page=1").content.decode()
+    card_calls = [
+        keys for keys in calls
+        if keys and all(key.startswith("template.cache.post_card")
+                        for key in keys)
+    ]
+    assert len(card_calls) == 1, (
+        "Убедитесь, что карточки страницы читаются из кэша одним"
+        " `get_many`."
+    )
+    assert posts[0].title in content and "Без сигнала" not in content, (
+        "Убедитесь, что карточки берутся из кэша."
+    )
+
+
+def test_cached_cards_match_fresh_render(
+        post_with_published_location, mixer, user, published_category):
+    posts = [
+        post_with_published_location,
+        *mixer.cycle(2).blend(
+            "blog.Post", author=user, category=published_category),
+    ]
+    source = (
+        "{% load blog_tags %}{% post_cards posts as cards %}"
+        "{% for card in cards %}{{ card }}|{% endfor %}"
+    )
+    fresh = render(source, posts=posts, card_cache_timeout=60)
+    cached = render(source, posts=posts, card_cache_timeout=60)
+    assert cached == fresh, (
+        "Убедитесь, что карточка из кэша выводится так же, как только"
+        " что отрендеренная."
+    )
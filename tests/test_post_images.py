@@ -0,0 +1,116 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog import images
+from blog.images import process_post_image
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+ORIENTATION = 0x0112
+
+
+@pytest.fixture(autouse=True)
+def image_widths(settings):
+    settings.BLOG_IMAGE_WIDTHS = (320, 640)
+
+
+@pytest.fixture
+def photo():
+    # Снимок 1000x500, который по метке EXIF нужно повернуть на 90°.
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6
+    buffer = BytesIO()
+    Image.new("RGB", (1000, 500), "red").save(buffer, "JPEG", exif=exif)
+    return SimpleUploadedFile(
+        "photo.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+
+@pytest.fixture
+def post_with_photo(mixer, user, published_category, photo):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, image=photo)
+
+
+def test_image_is_processed(post_with_photo):
+    post = post_with_photo
+    process_post_image(post.pk)
+    post.refresh_from_db()
+
+    assert (post.image_width, post.image_height) == (500, 1000), (
+        "Убедитесь, что размеры фото сохраняются с учётом ориентации EXIF."
+    )
+    with post.image.open() as file, Image.open(file) as original:
+        assert ORIENTATION not in original.getexif(), (
+            "Убедитесь, что из оригинала фото удаляются метаданные EXIF."
+        )
+    variants = {(v["format"], v["width"]) for v in post.image_variants}
+    assert variants == {
+        (fmt, width)
+        for fmt in ("webp", "jpeg") for width in (320, 500)
+    }, (
+        "Убедитесь, что копии строятся для ширин меньше оригинала и для"
+        " самого оригинала, в форматах WebP и JPEG."
+    )
+    for variant in post.image_variants:
+        with post.image.storage.open(variant["name"]) as file:
+            assert Image.open(file).width == variant["width"]
+
+
+def test_image_is_scheduled_after_commit(
+        post_with_photo, django_capture_on_commit_callbacks):
+    post = post_with_photo
+    assert post.image_info == {}
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        post.title = "Без нового фото"
+        post.save()
+    assert not callbacks, (
+        "Убедитесь, что фото не обрабатывается повторно, если не менялось."
+    )
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        buffer = BytesIO()
+        Image.new("P", (800, 600)).save(buffer, "GIF")
+        post.image = SimpleUploadedFile("other.gif", buffer.getvalue())
+        post.save()
+    assert len(callbacks) == 1
+    post.refresh_from_db()
+    assert post.image_width == 800
+
+
+def test_srcset_in_templates(client, post_with_photo):
+    post = post_with_photo
+    process_post_image(post.pk)
+    post.refresh_from_db()
+    for url in ("/", f"/posts/{post.pk}/"):
+        content = client.get(url).content.decode("utf-8")
+        assert post.image_webp_srcset in content
+        assert 'width="500" height="1000"' in content, (
+            f"Убедитесь, что на странице `{url}` у фото указаны srcset и"
+            " размеры."
+        )
+
+
+def test_processing_keeps_concurrent_edits(post_with_photo, monkeypatch):
+    post = post_with_photo
+    assert post.is_visible
+    strip_metadata = images.strip_metadata
+
+    def unpublish_meanwhile(*args):
+        # Автор снимает пост с публикации, пока обрабатывается фото.
+        author_copy = Post.objects.get(pk=post.pk)
+        author_copy.is_published = False
+        author_copy.save()
+        return strip_metadata(*args)
+
+    monkeypatch.setattr(images, "strip_metadata", unpublish_meanwhile)
+    process_post_image(post.pk)
+    post.refresh_from_db()
+    assert post.image_width == 500
+    assert (post.is_published, post.is_visible) == (False, False), (
+        "Убедитесь, что обработка фото записывает только `image_info` и"
+        " не затирает правки, сделанные во время обработки."
+    )
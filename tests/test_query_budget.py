@@ -0,0 +1,104 @@
+"""Бюджеты SQL-запросов на страницы блога.
+
+Страницы заполняются заметным объёмом данных, чтобы запросы «на каждую
+карточку» или «на каждый комментарий» сразу выходили за бюджет.
+"""
+import pytest
+from django.core.cache import cache
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS = 15
+
+# Сессия и пользователь авторизованного клиента входят в бюджет.
+QUERY_BUDGETS = {
+    "index": 4,
+    "post_detail": 7,
+    "profile": 5,
+    "category_posts": 5,
+    "add_comment": 7,
+    "edit_comment_get": 3,
+    "edit_comment_post": 4,
+    "delete_comment_get": 3,
+    "delete_comment_post": 7,
+}
+
+
+@pytest.fixture
+def seeded_posts(mixer, user, published_locations, published_category):
+    return mixer.cycle(N_PER_PAGE * 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=mixer.sequence(*published_locations),
+    )
+
+
+@pytest.fixture
+def commented_post(mixer, user, seeded_posts):
+    post = seeded_posts[0]
+    mixer.cycle(N_COMMENTS).blend("blog.Comment", post=post, author=user)
+    return post
+
+
+@pytest.fixture
+def own_comment(mixer, user, commented_post):
+    return mixer.blend("blog.Comment", post=commented_post, author=user)
+
+
+@pytest.mark.parametrize("name,url", [
+    ("index", lambda post, user: "/"),
+    ("post_detail", lambda post, user: f"/posts/{post.id}/"),
+    ("profile", lambda post, user: f"/profile/{user.username}/"),
+    ("category_posts",
+     lambda post, user: f"/category/{post.category.slug}/"),
+])
+def test_read_views_query_budget(
+        name, url, user, user_client, commented_post,
+        django_assert_max_num_queries):
+    page_url = url(commented_post, user)
+    with django_assert_max_num_queries(QUERY_BUDGETS[name]):
+        response = user_client.get(page_url)
+    assert response.status_code == 200
+
+
+def test_comment_views_query_budget(
+        user_client, commented_post, own_comment,
+        django_assert_max_num_queries):
+    post_id, comment_id = commented_post.id, own_comment.id
+    edit_url = f"/posts/{post_id}/edit_comment/{comment_id}/"
+    delete_url = f"/posts/{post_id}/delete_comment/{comment_id}/"
+
+    with django_assert_max_num_queries(QUERY_BUDGETS["add_comment"]):
+        user_client.post(f"/posts/{post_id}/comment/", {"text": "Текст"})
+    with django_assert_max_num_queries(QUERY_BUDGETS["edit_comment_get"]):
+        user_client.get(edit_url)
+    with django_assert_max_num_queries(QUERY_BUDGETS["edit_comment_post"]):
+        user_client.post(edit_url, {"text": "Новый текст"})
+    with django_assert_max_num_queries(QUERY_BUDGETS["delete_comment_get"]):
+        user_client.get(delete_url)
+    with django_assert_max_num_queries(
+            QUERY_BUDGETS["delete_comment_post"]):
+        response = user_client.post(delete_url)
+    assert response.status_code == 302
+
+
+@pytest.mark.parametrize("n_posts", [1, N_PER_PAGE])
+def test_profile_query_count_does_not_depend_on_page_size(
+        n_posts, mixer, user, user_client, another_user_client,
+        django_assert_num_queries):
+    # У каждой публикации свои категория и местоположение.
+    mixer.cycle(n_posts).blend(
+        "blog.Post",
+        author=user,
+        category__is_published=True,
+        location__is_published=True,
+    )
+    url = f"/profile/{user.username}/"
+    for client in (user_client, another_user_client):
+        cache.clear()
+        with django_assert_num_queries(QUERY_BUDGETS["profile"]):
+            response = client.get(url)
+        assert len(response.context["page_obj"]) == n_posts
@@ -0,0 +1,109 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+from blog.routers import ReplicaRouter
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def reads(settings, monkeypatch):
+    """Базы, которые роутер выбрал для чтения моделей блога; реплика —
+    сама основная база под именем `default`, «основная» — `None`."""
+    settings.BLOG_DB_REPLICAS = ["default"]
+    # Реплика считается догнавшей основную базу сразу после записи.
+    settings.BLOG_REPLICA_LAG = 0
+    chosen = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        db = db_for_read(self, model, **hints)
+        if model._meta.app_label == "blog":
+            chosen.append(db)
+        return db
+
+    monkeypatch.setattr(ReplicaRouter, "db_for_read", spy)
+    return chosen
+
+
+@pytest.fixture
+def post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1))
+
+
+def test_read_views_use_replica(client, post, reads):
+    for url in ("/", f"/posts/{post.id}/",
+                f"/category/{post.category.slug}/",
+                f"/profile/{post.author.username}/"):
+        reads.clear()
+        assert client.get(url).status_code == 200
+        assert reads and set(reads) == {"default"}, (
+            f"Убедитесь, что страница `{url}` читает данные с реплики."
+        )
+
+    reads.clear()
+    client.get("/search/", {"q": post.title})
+    assert set(reads) == {None}
+
+
+def test_author_reads_own_writes_from_primary(
+        user_client, client, post, reads):
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Первый!"})
+    assert response.status_code == 302
+    assert set(reads) <= {None}, (
+        "Убедитесь, что запросы, изменяющие данные, читают основную базу."
+    )
+    assert "read_primary" in response.cookies, (
+        "Убедитесь, что после комментария автор получает cookie чтения"
+        " с основной базы."
+    )
+
+    reads.clear()
+    assert user_client.get(f"/posts/{post.id}/").status_code == 200
+    assert reads and set(reads) == {None}, (
+        "Убедитесь, что после изменения автор видит страницу с основной"
+        " базы."
+    )
+    reads.clear()
+    client.get(f"/posts/{post.id}/")
+    assert set(reads) == {"default"}
+
+
+def test_reads_after_write_use_primary(
+        client, post, reads, settings, monkeypatch):
+    settings.BLOG_REPLICA_LAG = 10
+    post.title = "Новый заголовок"
+    post.save()
+    for url in ("/", f"/posts/{post.id}/"):
+        reads.clear()
+        assert post.title in client.get(url).content.decode("utf-8")
+        assert reads and set(reads) == {None}, (
+            "Убедитесь, что сразу после изменения страницы, которые попадут"
+            " в кэш, читаются с основной базы, а не с отстающей реплики."
+        )
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 10)
+    reads.clear()
+    client.get(f"/category/{post.category.slug}/")
+    assert reads and set(reads) == {"default"}
+
+
+def test_sessions_and_users_read_from_primary(
+        user_client, user, post, reads):
+    for model in (Session, type(user)):
+        assert ReplicaRouter().db_for_read(model) is None
+    content = user_client.get("/").content.decode("utf-8")
+    assert reads and set(reads) == {"default"}
+    assert user.username in content, (
+        "Убедитесь, что сессия и пользователь читаются с основной базы:"
+        " иначе только что вошедший посетитель на отстающей реплике"
+        " выглядит анонимным."
+    )
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.core import serializers
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+BUMP_FEED = (
+    "import django; django.setup(); "
+    "from blog.cache import bump_versions, feed_listing; "
+    "bump_versions({feed_listing()})"
+)
+
+
+def test_scheduled_post_is_published_by_command(
+        client, mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert not post.is_visible
+    feed = client.get("/").content.decode("utf-8")
+    assert post.title not in feed
+
+    # Дата публикации наступила без сохранения поста.
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(minutes=1))
+    assert post.title not in client.get("/").content.decode("utf-8")
+
+    call_command("publish_scheduled")
+    post.refresh_from_db()
+    assert post.is_visible, (
+        "Убедитесь, что команда publish_scheduled открывает публикации,"
+        " дата которых наступила."
+    )
+    for url in ("/", f"/category/{published_category.slug}/"):
+        assert post.title in client.get(url).content.decode("utf-8"), (
+            "Убедитесь, что после открытия отложенной публикации"
+            f" закэшированная страница `{url}` обновляется."
+        )
+
+
+def test_versions_are_shared_between_processes(
+        client, post_with_published_location):
+    etag = client.get("/")["ETag"]
+    # Так сбрасывает версии `publish_scheduled`, запущенный рядом с сайтом.
+    subprocess.run(
+        [sys.executable, "-c", BUMP_FEED], check=True,
+        cwd=Path(__file__).resolve().parent.parent / "blogicum",
+        env={**os.environ, "DJANGO_SETTINGS_MODULE": "blogicum.settings"},
+    )
+    assert client.get("/", HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что версии кэша общие для всех процессов: иначе сайт"
+        " не узнает о публикациях, открытых планировщиком."
+    )
+
+
+def test_save_recomputes_visibility(mixer, user):
+    post = mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+    assert post.is_visible
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save(update_fields=["pub_date"])
+    post.refresh_from_db()
+    assert not post.is_visible
+
+
+def test_loaddata_sets_visibility(mixer, user, published_category):
+    past, future = timezone.now() - timedelta(days=1), timezone.now()
+    posts = [
+        mixer.blend("blog.Post", author=user, category=published_category,
+                    is_published=is_published, pub_date=pub_date)
+        for is_published, pub_date in (
+            (True, past), (False, past), (True, future + timedelta(days=1)))
+    ]
+    raw = serializers.serialize("python", posts)
+    Post.objects.update(is_visible=False)
+    for deserialized in serializers.deserialize("python", raw):
+        # Так сохраняет объекты `loaddata`: в обход `Post.save()`.
+        deserialized.save()
+    assert list(Post.objects.order_by("pk").values_list(
+        "is_visible", flat=True)) == [True, False, False], (
+        "Убедитесь, что после `loaddata` видны только опубликованные посты"
+        " с наступившей датой публикации."
+    )
@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def blend_post(mixer, user, published_category):
+    def blend(**kwargs):
+        return mixer.blend(
+            "blog.Post",
+            **{
+                "author": user,
+                "category": published_category,
+                "is_published": True,
+                "pub_date": timezone.now() - timedelta(days=1),
+                **kwargs,
+            },
+        )
+    return blend
+
+
+def found(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_ranks_title_matches_first(client, blend_post):
+    in_text = blend_post(title="Заметка", text="Поход на Эльбрус летом")
+    in_title = blend_post(title="Эльбрус", text="Заметки о восхождении")
+    blend_post(title="Другое", text="Ничего общего")
+    assert found(client, "эльбрус") == [in_title.id, in_text.id], (
+        "Убедитесь, что поиск находит публикации по заголовку и тексту"
+        " без учёта регистра, а совпадения в заголовке выше."
+    )
+    assert found(client, "Эльбр") == [in_title.id, in_text.id], (
+        "Убедитесь, что слова запроса ищутся по началу слова."
+    )
+    assert found(client, "Эльбрус летом") == [in_text.id]
+
+
+def test_search_follows_visibility(client, blend_post):
+    post = blend_post(title="Байкал", text="Лёд")
+    hidden = blend_post(
+        title="Байкал зимой", text="Лёд", is_published=False)
+    scheduled = blend_post(
+        title="Байкал летом", text="Вода",
+        pub_date=timezone.now() + timedelta(days=1))
+    assert found(client, "байкал") == [post.id], (
+        "Убедитесь, что поиск не показывает скрытые и отложенные посты."
+    )
+
+    hidden.is_published = True
+    hidden.save()
+    assert set(found(client, "байкал")) == {post.id, hidden.id}
+
+    post.title = "Озеро"
+    post.text = "Вода"
+    post.save()
+    assert found(client, "байкал") == [hidden.id], (
+        "Убедитесь, что индекс обновляется при изменении поста."
+    )
+
+    hidden.category.is_published = False
+    hidden.category.save()
+    assert found(client, "байкал") == []
+
+    hidden.category.is_published = True
+    hidden.category.save()
+    hidden.delete()
+    assert found(client, "байкал") == []
+    assert scheduled.id not in found(client, "вода")
+
+
+def test_search_is_paginated(client, blend_post):
+    posts = [
+        blend_post(title=f"Вулкан {i}", text="Камчатка")
+        for i in range(N_PER_PAGE + 3)
+    ]
+    response = client.get("/search/", {"q": "камчатка"})
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+    assert response.context["paginator"].count == len(posts)
+    assert "?q=%D0%BA%D0%B0%D0%BC%D1%87%D0%B0%D1%82%D0%BA%D0%B0&amp;page=2" in (
+        response.content.decode("utf-8")), (
+        "Убедитесь, что ссылки пагинатора сохраняют поисковый запрос."
+    )
+    response = client.get("/search/", {"q": "камчатка", "page": 2})
+    assert len(response.context["page_obj"]) == 3
+
+
+@pytest.mark.parametrize("query", ['"', "AND", "a OR b*", "title:x", "(", ""])
+def test_search_query_syntax_is_escaped(client, blend_post, query):
+    blend_post(title="Текст", text="Текст")
+    assert found(client, query) == []
+
+
+def test_search_ranks_newest_matches_only(client, settings, blend_post):
+    settings.BLOG_SEARCH_WINDOW = 3
+    posts = [blend_post(title="Тайга", text="Лес") for _ in range(5)]
+    response = client.get("/search/", {"q": "тайга"})
+    assert sorted(found(client, "тайга")) == [post.id for post in posts[2:]]
+    assert response.context["results_capped"]
+
+
+def test_backend_must_define_search():
+    from blog.search import SearchBackend
+
+    class CountOnly(SearchBackend):
+        def count(self, query):
+            return 0
+
+    with pytest.raises(TypeError):
+        CountOnly()
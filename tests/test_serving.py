@@ -0,0 +1,88 @@
+import gzip
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from blogicum.serving import serve_static
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / "post_images").mkdir()
+    (tmp_path / "post_images" / "photo.jpg").write_bytes(CONTENT)
+    return "/media/post_images/photo.jpg"
+
+
+def test_media_is_served_with_validators(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == CONTENT
+    assert response["Accept-Ranges"] == "bytes"
+    assert "max-age" in response["Cache-Control"]
+
+    response = client.get(
+        media_file, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304, (
+        "Убедитесь, что файл медиа не передаётся повторно, если ETag"
+        " совпадает."
+    )
+
+
+def test_media_range_requests(client, media_file):
+    response = client.get(media_file, HTTP_RANGE="bytes=10-19")
+    assert response.status_code == 206
+    assert response["Content-Range"] == f"bytes 10-19/{len(CONTENT)}"
+    assert b"".join(response.streaming_content) == CONTENT[10:20]
+
+    response = client.get(media_file, HTTP_RANGE="bytes=-5")
+    assert b"".join(response.streaming_content) == CONTENT[-5:]
+
+    response = client.get(
+        media_file, HTTP_RANGE=f"bytes={len(CONTENT)}-")
+    assert response.status_code == 416
+
+    response = client.get(
+        media_file, HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE='"stale"')
+    assert response.status_code == 200, (
+        "Убедитесь, что при изменившемся файле `If-Range` отдаёт его"
+        " целиком."
+    )
+
+
+def test_media_offload_to_web_server(client, settings, media_file):
+    settings.BLOG_MEDIA_ACCEL = "x-accel-redirect"
+    response = client.get(media_file)
+    assert response["X-Accel-Redirect"] == (
+        "/protected-media/post_images/photo.jpg")
+    assert response.content == b""
+
+
+def test_media_path_traversal(client, media_file):
+    assert client.get("/media/../settings.py").status_code == 404
+
+
+def test_collected_static_is_hashed_and_compressed(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATICFILES_STORAGE = (
+        "blogicum.storage.CompressedManifestStaticFilesStorage")
+    call_command("collectstatic", interactive=False, verbosity=0)
+
+    hashed = next((tmp_path / "css").glob("bootstrap.min.*.css"))
+    compressed = hashed.with_name(hashed.name + ".gz")
+    assert gzip.decompress(compressed.read_bytes()) == hashed.read_bytes(), (
+        "Убедитесь, что collectstatic сохраняет сжатые копии статики."
+    )
+
+    request = RequestFactory().get(
+        f"/static/css/{hashed.name}", HTTP_ACCEPT_ENCODING="gzip, br")
+    response = serve_static(request, f"css/{hashed.name}")
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"] == "text/css"
+    assert "immutable" in response["Cache-Control"]
+    assert response["Vary"] == "Accept-Encoding"
@@ -0,0 +1,29 @@
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_connection_gets_sqlite_profile(settings):
+    connection.close()
+    connection.ensure_connection()
+    assert pragma("synchronous") == 1, (
+        "Убедитесь, что соединение с SQLite получает synchronous=NORMAL."
+    )
+    assert pragma("cache_size") == settings.BLOG_SQLITE_PRAGMAS["cache_size"]
+
+
+def test_atomic_begins_immediate():
+    with CaptureQueriesContext(connection) as queries:
+        with transaction.atomic():
+            pass
+    assert queries[0]["sql"] == "BEGIN IMMEDIATE", (
+        "Убедитесь, что транзакции в SQLite сразу берут блокировку записи."
+    )
@@ -0,0 +1,36 @@
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.template.loaders.filesystem import Loader as FilesystemLoader
+
+from blogicum.warmup import warm_up_templates
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_warm_up_compiles_templates(client):
+    engine = engines["django"].engine
+    for loader in engine.template_loaders:
+        loader.reset()
+    assert warm_up_templates() > 20
+    assert isinstance(engine.template_loaders[0], CachedLoader), (
+        "Убедитесь, что шаблоны загружаются кэширующим загрузчиком."
+    )
+    get_contents = FilesystemLoader.get_contents
+
+    def read_from_disk(self, origin):
+        # Виджеты форм рендерит отдельный движок форм.
+        assert not origin.name.startswith(str(settings.TEMPLATES_DIR)), (
+            f"Шаблон {origin.template_name} прочитан с диска."
+        )
+        return get_contents(self, origin)
+
+    with mock.patch.object(FilesystemLoader, "get_contents", read_from_disk):
+        for url in ("/", "/pages/about/", "/auth/login/"):
+            assert client.get(url).status_code == 200, (
+                "Убедитесь, что после прогрева страницы рендерятся без"
+                " чтения шаблонов с диска."
+            )